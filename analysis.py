@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import chat_completion
+from summarizer import chunk_texts, reduce_summaries, SUMMARY_MAX_WORKERS
+from preprocess import preprocess_texts
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+ANALYSIS_DIR = os.path.join(CACHE_DIR, "analysis")
+ANALYSIS_VERSION = 3  # 프롬프트/형식이 바뀌면 올려서 저장된 결과를 무효화
+ANALYSIS_MAX_TOKENS = 1000
+ANALYSIS_KEEP_DAYS = 14  # 이보다 오래된 저장 결과는 새로 저장할 때 정리
+
+ANALYSIS_PROMPT = """
+다음은 오늘 팀 채널에서 나눈 대화 내용{scope}입니다. 대화를 분석해 아래 JSON 형식으로만 답하세요.
+{{
+  "summary": "1. 주요 논의 사항 2. 결정된 사항 3. 다음 단계 작업 4. 특이사항 순서의 요약 (줄바꿈 포함 문자열)",
+  "action_items": [{{"owner": "담당자 이름 (명확하지 않으면 미지정)", "task": "할 일"}}],
+  "counts": {{"decisions": 결정된 사항 수, "questions": 답이 나오지 않은 질문 수}}
+}}
+
+대화 내용:
+{conversation}
+"""
+
+MERGE_SUMMARY_PROMPT = """
+다음은 오늘 팀 채널 대화를 구간별로 요약한 내용입니다. 하나의 요약으로 합쳐주세요:
+
+{conversation}
+
+다음 형식으로 요약해주세요:
+1. 주요 논의 사항
+2. 결정된 사항
+3. 다음 단계 작업
+4. 특이사항
+"""
+
+
+def _parse_analysis(content):
+    """응답 JSON을 {"summary", "action_items", "counts"} 형태로 정리합니다. JSON이 아니면 전체를 요약으로 취급."""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        data = {"summary": content}
+    if not isinstance(data, dict):
+        data = {"summary": str(data)}
+    items = []
+    for item in data.get("action_items") or []:
+        if isinstance(item, dict) and str(item.get("task", "")).strip():
+            items.append({"owner": str(item.get("owner") or "미지정").strip(), "task": str(item["task"]).strip()})
+    counts = {}
+    raw_counts = data.get("counts")
+    for key, value in (raw_counts.items() if isinstance(raw_counts, dict) else []):
+        if isinstance(value, (int, float)):
+            counts[key] = int(value)
+    summary = data.get("summary") or ""
+    if not isinstance(summary, str):
+        summary = json.dumps(summary, ensure_ascii=False)
+    return {"summary": summary.strip(), "action_items": items, "counts": counts}
+
+
+def _analyze_chunk(conversation, scope=""):
+    resp = chat_completion(
+        [{"role": "user", "content": ANALYSIS_PROMPT.format(scope=scope, conversation=conversation)}],
+        max_tokens=ANALYSIS_MAX_TOKENS, temperature=0.3,
+        response_format={"type": "json_object"},
+    )
+    return _parse_analysis(resp.choices[0].message.content)
+
+
+def merge_analyses(partials):
+    """구간별 분석 결과를 합칩니다: 요약은 LLM으로 합치고, Action Item은 중복 제거, 개수는 더합니다."""
+    partials = [p for p in partials if p["summary"] or p["action_items"]]
+    if not partials:
+        return {"summary": "", "action_items": [], "counts": {}}
+    if len(partials) == 1:
+        return partials[0]
+    summary = reduce_summaries([p["summary"] for p in partials], MERGE_SUMMARY_PROMPT, max_tokens=500)
+    seen, items, counts = set(), [], {}
+    for partial in partials:
+        for item in partial["action_items"]:
+            key = (item["owner"], item["task"])
+            if key not in seen:
+                seen.add(key)
+                items.append(item)
+        for key, value in partial["counts"].items():
+            counts[key] = counts.get(key, 0) + value
+    return {"summary": summary.strip(), "action_items": items, "counts": counts}
+
+
+def analyze_conversation(texts, max_workers=None, scope=""):
+    """
+    대화 전체에 대해 요약, 담당자별 Action Item, 개수를 JSON 한 번의 호출로 얻습니다.
+    컨텍스트를 넘는 날은 구간별로 동시에 분석한 뒤 merge_analyses로 합칩니다.
+    메시지는 preprocess_texts로 정리(마크업, 긴 블록, 내용 없는 메시지, 근사 중복)한 뒤 프롬프트에 넣습니다.
+    """
+    texts, _ = preprocess_texts(texts, label="대화 분석")
+    chunks = chunk_texts(texts)
+    if not chunks:
+        return {"summary": "", "action_items": [], "counts": {}}
+    if len(chunks) == 1:
+        return _analyze_chunk(chunks[0], scope=scope)
+    print(f"📚 대화를 {len(chunks)}개 구간으로 나눠 분석합니다.")
+    with ThreadPoolExecutor(max_workers=max_workers or SUMMARY_MAX_WORKERS) as pool:
+        partials = list(pool.map(lambda chunk: _analyze_chunk(chunk, scope=scope + "의 일부"), chunks))
+    return merge_analyses(partials)
+
+
+_analyses = {}
+_analysis_locks = {}
+_analyses_lock = threading.Lock()
+
+
+def texts_digest(texts):
+    return hashlib.sha256(f"{ANALYSIS_VERSION}\0".encode("utf-8") + "\0".join(texts).encode("utf-8")).hexdigest()
+
+
+def get_daily_analysis(texts):
+    """
+    같은 메시지 목록에 대한 분석 결과를 프로세스 안(메모리)과 실행 간(.cache/analysis)에 공유합니다.
+    여러 스레드가 동시에 요청해도 분석은 한 번만 실행됩니다.
+    """
+    digest = texts_digest(texts)
+    with _analyses_lock:
+        lock = _analysis_locks.setdefault(digest, threading.Lock())
+    with lock:
+        if digest in _analyses:
+            return _analyses[digest]
+        path = os.path.join(ANALYSIS_DIR, f"{digest}.json")
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                result = json.load(f)
+        else:
+            result = analyze_conversation(texts)
+            _save_analysis(path, result)
+        _analyses[digest] = result
+        return result
+
+
+def remember_analysis(texts, result):
+    """
+    다른 방법(예: 시간대별 부분 분석을 합친 결과)으로 얻은 분석을 get_daily_analysis 저장소에 넣어
+    같은 메시지로 실행되는 productivity_bot이 다시 분석하지 않게 합니다.
+    """
+    digest = texts_digest(texts)
+    with _analyses_lock:
+        lock = _analysis_locks.setdefault(digest, threading.Lock())
+    with lock:
+        _save_analysis(os.path.join(ANALYSIS_DIR, f"{digest}.json"), result)
+        _analyses[digest] = result
+
+
+def _save_analysis(path, result):
+    os.makedirs(ANALYSIS_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=ANALYSIS_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(result, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    _prune_saved_analyses()
+
+
+def _prune_saved_analyses():
+    cutoff = time.time() - ANALYSIS_KEEP_DAYS * 86400
+    for name in os.listdir(ANALYSIS_DIR):
+        path = os.path.join(ANALYSIS_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass  # 다른 채널 스레드가 먼저 지움
+
+
+COUNT_LABELS = {"decisions": "결정된 사항", "questions": "답이 나오지 않은 질문"}
+
+
+def format_counts(analysis):
+    """개수를 "결정된 사항 3건, 답이 나오지 않은 질문 1건" 형태로 (없으면 빈 문자열)"""
+    counts = analysis.get("counts") or {}
+    return ", ".join(f"{label} {counts[key]}건" for key, label in COUNT_LABELS.items() if key in counts)
+
+
+def format_action_items(analysis, with_owner=True):
+    """Action Item을 "- [담당자] 할 일" (with_owner=False면 "- 할 일") 줄 목록으로 만듭니다."""
+    if with_owner:
+        return [f"- [{item['owner']}] {item['task']}" for item in analysis["action_items"]]
+    return [f"- {item['task']}" for item in analysis["action_items"]]
@@ -0,0 +1,340 @@
+# 벤치마크용 로컬 가짜 서버: Slack Web API, OpenAI(chat completions/embeddings), Notion을 한 포트에서 흉내냅니다.
+#
+#   /slack/api/<method>          → SLACK_API_URL=http://127.0.0.1:<port>/slack/api/
+#   /openai/v1/chat/completions  → OPENAI_BASE_URL=http://127.0.0.1:<port>/openai/v1
+#   /openai/v1/embeddings
+#   /notion/v1/...               → NOTION_BASE_URL=http://127.0.0.1:<port>/notion
+#   /bench/events?n=N            → cheer 시나리오에 넣을 대상 유저 메시지 (통계에 포함하지 않음)
+#
+# 서비스별 지연(latency)과 429 응답 비율을 설정할 수 있고, 호출 수/429 수/보낸·생성한 토큰 수를 셉니다.
+
+import base64
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import estimate_tokens  # noqa: E402
+from synthetic import TARGET_USER  # noqa: E402
+
+SERVICES = ("slack", "openai", "notion")
+DIGITS_RE = re.compile(r"\d+")
+TASK_LINE_RE = re.compile(r"^.*(부탁드립니다|할게요|해 주실 수 있을까요).*$", re.MULTILINE)
+
+
+class FakeConfig:
+    """
+    latency: 서비스별 응답 지연(초), rate_429: 서비스별 429 응답 비율(0~1), retry_after: 429의 Retry-After(초)
+    tokens_per_second: OpenAI 생성 속도(0이면 즉시), embedding_dim: 임베딩 차원
+    """
+
+    def __init__(self, latency=None, rate_429=None, retry_after=1, tokens_per_second=0, embedding_dim=1536, seed=0):
+        self.latency = dict.fromkeys(SERVICES, 0.0)
+        self.latency.update(latency or {})
+        self.rate_429 = dict.fromkeys(SERVICES, 0.0)
+        self.rate_429.update(rate_429 or {})
+        self.retry_after = retry_after
+        self.tokens_per_second = tokens_per_second
+        self.embedding_dim = embedding_dim
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class FakeServices:
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or FakeConfig()
+        self.channels = {}
+        self.lock = threading.Lock()
+        self.rng = random.Random(self.config.seed)
+        self.reset_stats()
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """봇 프로세스가 가짜 서버를 쓰도록 하는 환경변수"""
+        return {
+            "SLACK_API_URL": f"{self.base}/slack/api/",
+            "OPENAI_BASE_URL": f"{self.base}/openai/v1",
+            "NOTION_BASE_URL": f"{self.base}/notion",
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def load_channel(self, channel, data):
+        """synthetic.generate_channel 결과를 채널로 등록합니다. conversations.history는 최신순으로 돌려줌."""
+        with self.lock:
+            self.channels[channel] = {
+                "newest_first": sorted(data["messages"], key=lambda m: float(m["ts"]), reverse=True),
+                "by_ts": {m["ts"]: m for m in data["messages"]},
+                "replies": data["replies"],
+                "users": data["users"],
+                "posted": 0,
+            }
+
+    def reset_stats(self):
+        with self.lock:
+            self.calls = Counter()
+            self.throttled = Counter()
+            self.tokens_sent = 0
+            self.tokens_generated = 0
+            self.embedding_inputs = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "api_calls": dict(sorted(self.calls.items())),
+                "api_calls_total": sum(self.calls.values()),
+                "throttled": dict(sorted(self.throttled.items())),
+                "tokens_sent": self.tokens_sent,
+                "tokens_generated": self.tokens_generated,
+                "embedding_inputs": self.embedding_inputs,
+            }
+
+    def _record(self, name, sent=0, generated=0):
+        with self.lock:
+            self.calls[name] += 1
+            self.tokens_sent += sent
+            self.tokens_generated += generated
+
+    def _should_throttle(self, service, name):
+        with self.lock:
+            if self.rng.random() < self.config.rate_429[service]:
+                self.throttled[name] += 1
+                return True
+        return False
+
+    # ---- Slack ----
+
+    def slack(self, method, params):
+        channel = self.channels.get(params.get("channel")) or next(iter(self.channels.values()), None)
+        if method == "auth.test":
+            return {"ok": True, "user_id": "UBOT", "team": "bench"}
+        if method == "conversations.history":
+            oldest = float(params.get("oldest") or 0)
+            latest = float(params.get("latest") or "inf")
+            matched = [m for m in channel["newest_first"] if oldest < float(m["ts"]) <= latest]
+            return _page(matched, params, "messages")
+        if method == "conversations.replies":
+            parent = channel["by_ts"].get(params.get("ts"))
+            thread = ([parent] if parent else []) + channel["replies"].get(params.get("ts"), [])
+            return _page(thread, params, "messages")
+        if method == "conversations.list":
+            return _page([{"id": c, "is_member": True, "is_archived": False} for c in self.channels], params, "channels")
+        if method == "users.list":
+            members = [{"id": u, "name": u.lower(), "profile": {"display_name": f"user{u[-4:]}"}}
+                       for u in (channel["users"] if channel else [])]
+            return _page(members, params, "members")
+        if method == "users.info":
+            user = params.get("user")
+            return {"ok": True, "user": {"id": user, "name": user.lower(), "profile": {"display_name": f"user{user[-4:]}"}}}
+        if method == "chat.postMessage":
+            with self.lock:
+                channel["posted"] += 1
+                ts = f"{time.time():.6f}"
+            return {"ok": True, "channel": params.get("channel"), "ts": ts,
+                    "message": {"text": params.get("text"), "ts": ts}}
+        if method in ("chat.update", "chat.delete", "reactions.add"):
+            return {"ok": True, "channel": params.get("channel"), "ts": params.get("ts") or params.get("timestamp")}
+        return {"ok": False, "error": "unknown_method"}
+
+    # ---- OpenAI ----
+
+    def chat_reply(self, prompt, json_mode):
+        """이 저장소의 프롬프트 형식을 보고 그럴듯한 응답을 만듭니다."""
+        if json_mode and '"labels"' in prompt and "메시지 목록(JSON):\n" in prompt:
+            items = json.loads(prompt.split("메시지 목록(JSON):\n", 1)[1])
+            labels = [{"id": item["id"], "label": "chatter" if zlib.crc32(item["text"].encode()) % 3 == 0
+                       else "informative"} for item in items]
+            return json.dumps({"labels": labels})
+        if json_mode:
+            tasks = [re.sub(r"<@\w+>|@\S+", "", m.group(0)).strip() for m in TASK_LINE_RE.finditer(prompt)]
+            tasks = list(dict.fromkeys(t for t in tasks if t))[:8]
+            return json.dumps({
+                "summary": "1. 주요 논의 사항: 배포 일정과 장애 원인\n2. 결정된 사항: 일정 확정\n"
+                           "3. 다음 단계 작업: 리뷰와 테스트\n4. 특이사항: 빌드 실패 알림 반복",
+                "action_items": [{"owner": "미지정", "task": task} for task in tasks],
+                "counts": {"decisions": prompt.count("결정"), "questions": prompt.count("?")},
+            }, ensure_ascii=False)
+        if "informative 또는 chatter" in prompt:
+            return "informative"
+        return ("1. 주요 논의 사항: 배포 일정, 로그인 API 장애\n2. 결정된 사항: 금요일 배포\n"
+                "3. 다음 단계 작업: 테스트 보강\n4. 특이사항: 없음")
+
+    def embedding(self, text):
+        """숫자만 다른 텍스트(반복 알림 등)는 같은 벡터가 되도록 숫자를 지우고 해시로 시드를 정함"""
+        import numpy as np
+        seed = zlib.crc32(DIGITS_RE.sub("", text).encode("utf-8"))
+        return np.random.default_rng(seed).standard_normal(self.config.embedding_dim, dtype=np.float32)
+
+    def generation_delay(self, tokens):
+        return tokens / self.config.tokens_per_second if self.config.tokens_per_second else 0.0
+
+
+def _page(items, params, key):
+    """Slack 방식 커서 페이지네이션 (커서 = 시작 위치)"""
+    limit = int(params.get("limit") or 100)
+    start = int(params.get("cursor") or 0)
+    page = items[start:start + limit]
+    next_cursor = str(start + limit) if start + limit < len(items) else ""
+    return {"ok": True, key: page, "has_more": bool(next_cursor), "response_metadata": {"next_cursor": next_cursor}}
+
+
+def _make_handler(services):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            if "json" in (self.headers.get("Content-Type") or ""):
+                return json.loads(raw or b"{}")
+            params = {k: v[0] for k, v in parse_qs(raw.decode("utf-8")).items()}
+            params.update({k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()})
+            return params
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._dispatch()
+
+        def do_POST(self):
+            self._dispatch()
+
+        def do_PATCH(self):
+            self._dispatch()
+
+        def _dispatch(self):
+            path = urlparse(self.path).path
+            body = self._body()
+            if path.startswith("/bench/events"):
+                return self._send(200, self._events(int(body.get("n") or 100)))
+            if path.startswith("/slack/api/"):
+                return self._slack(path[len("/slack/api/"):], body)
+            if path.startswith("/openai/v1/"):
+                return self._openai(path[len("/openai/v1/"):], body)
+            if path.startswith("/notion/"):
+                return self._notion(path[len("/notion"):], body)
+            self._send(404, {"error": "not_found"})
+
+        def _throttle(self, service, name, payload):
+            time.sleep(services.config.latency[service])
+            if services._should_throttle(service, name):
+                self._send(429, payload, {"Retry-After": str(services.config.retry_after)})
+                return True
+            return False
+
+        def _slack(self, method, params):
+            name = f"slack.{method}"
+            if self._throttle("slack", name, {"ok": False, "error": "ratelimited"}):
+                return
+            services._record(name)
+            self._send(200, services.slack(method, params))
+
+        def _openai(self, endpoint, body):
+            name = f"openai.{endpoint.replace('/', '.')}"
+            if self._throttle("openai", name, {"error": {"message": "Rate limit reached (bench)",
+                                                         "type": "requests", "code": "rate_limit_exceeded"}}):
+                return
+            model = body.get("model", "gpt-3.5-turbo")
+            if endpoint == "embeddings":
+                texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                sent = sum(estimate_tokens(t) for t in texts)
+                data = []
+                for i, text in enumerate(texts):
+                    vector = services.embedding(text)
+                    encoded = (base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+                               if body.get("encoding_format") == "base64" else vector.tolist())
+                    data.append({"object": "embedding", "index": i, "embedding": encoded})
+                services._record(name, sent=sent)
+                with services.lock:
+                    services.embedding_inputs += len(texts)
+                return self._send(200, {"object": "list", "data": data, "model": model,
+                                        "usage": {"prompt_tokens": sent, "total_tokens": sent}})
+            if endpoint != "chat/completions":
+                return self._send(404, {"error": {"message": "not found"}})
+            prompt = "\n".join(str(m.get("content", "")) for m in body["messages"])
+            json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+            reply = services.chat_reply(prompt, json_mode)
+            sent, generated = estimate_tokens(prompt), estimate_tokens(reply)
+            services._record(name, sent=sent, generated=generated)
+            if body.get("stream"):
+                return self._stream(model, reply, generated)
+            time.sleep(services.generation_delay(generated))
+            self._send(200, {
+                "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": sent, "completion_tokens": generated, "total_tokens": sent + generated},
+            })
+
+        def _stream(self, model, reply, generated):
+            """SSE로 몇 글자씩 나눠 보냅니다. 생성 속도를 설정했으면 조각마다 그만큼 기다림."""
+            pieces = [reply[i:i + 4] for i in range(0, len(reply), 4)]
+            delay = services.generation_delay(generated) / max(len(pieces), 1)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for piece in pieces + [None]:
+                chunk = {"id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": model, "choices": [{"index": 0, "delta": {"content": piece} if piece else {},
+                                                      "finish_reason": None if piece else "stop"}]}
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+        def _notion(self, path, body):
+            name = "notion." + re.sub(r"/[0-9a-zA-Z-]{8,}", "/{id}", path).strip("/").replace("/", ".")
+            if self._throttle("notion", name, {"object": "error", "status": 429, "code": "rate_limited",
+                                               "message": "Rate limited (bench)"}):
+                return
+            services._record(name, sent=estimate_tokens(json.dumps(body, ensure_ascii=False)))
+            self._send(200, {"object": "list", "results": [], "next_cursor": None, "has_more": False})
+
+        def _events(self, n):
+            channel_id, channel = next(iter(services.channels.items()))
+            events = []
+            for message in reversed(channel["newest_first"]):
+                if len(events) >= n:
+                    break
+                if message.get("user") and message.get("text"):
+                    events.append(dict(message, channel=channel_id, user=TARGET_USER))
+            return events
+
+    return Handler
@@ -0,0 +1,269 @@
+# 오프라인 벤치마크: 로컬 가짜 Slack/OpenAI/Notion 서버(bench/fake_services.py)에 대고
+# summary_bot, productivity_bot, cheer_bot 이벤트 처리를 합성 채널 크기별로 실행합니다.
+#
+# 사용 예:
+#   python bench/run_bench.py                                   # 100, 1000개 × 모든 시나리오
+#   python bench/run_bench.py --sizes 100,10000,100000 --scenarios summary,productivity
+#   python bench/run_bench.py --openai-latency 0.5 --tokens-per-second 50 --rate-429 0.02 --warm
+#   python bench/run_bench.py --out bench/results.json --compare bench/baseline.json --fail-over 0.2
+#
+# 시나리오마다 새 프로세스(빈 .cache)에서 실행하고 벽시계 시간, 최대 RSS, API 호출 수, 429 수,
+# 보낸/생성된 토큰 수를 JSON으로 남깁니다. --warm 이면 같은 .cache로 한 번 더 실행합니다.
+# 기본은 rate_limit의 토큰 버킷 한도를 풀어 봇 자체의 비용만 재고, --real-limits 면 실제 한도를 지킵니다.
+# cheer 시나리오의 ack p99가 --max-ack-ms(기본 1000ms)를 넘으면 종료 코드 1로 끝납니다.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+SCENARIOS = ["summary", "summary-incremental", "productivity", "cheer", "cheer-stream"]
+CHANNEL = "CBENCH"
+COMPARE_METRICS = ["wall_seconds", "peak_rss_mb", "api_calls_total", "tokens_sent"]
+
+
+def child_env(services, scenario, workdir, real_limits):
+    env = dict(os.environ)
+    env.update(services.env())
+    env.update({
+        "SLACK_BOT_TOKEN": "xoxb-bench", "SLACK_APP_TOKEN": "xapp-bench", "OPENAI_API_KEY": "sk-bench",
+        "NOTION_TOKEN": "secret-bench", "NOTION_PAGE_ID": "page-bench", "BOT_USER_ID": "UBOT",
+        "CHANNEL_ID": CHANNEL, "CHANNEL_IDS": "", "CACHE_DIR": os.path.join(workdir, ".cache"),
+        "LLM_CACHE": "0", "CHEER_STREAMING": "1" if scenario == "cheer-stream" else "0",
+    })
+    if not real_limits:
+        env.update({"OPENAI_RPM": "100000000", "OPENAI_TPM": "100000000000", "OPENAI_EMBEDDING_TPM": "100000000000"})
+    return env
+
+
+def run_scenario(services, scenario, size, workdir, args):
+    """봇 프로세스를 하나 띄워 시나리오를 실행하고, 프로세스 측 결과와 가짜 서버 통계를 합칩니다."""
+    services.reset_stats()
+    result_path = os.path.join(workdir, "result.json")
+    if os.path.exists(result_path):
+        os.remove(result_path)
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", scenario, "--result-file", result_path,
+           "--events", str(min(size, args.max_events)), "--events-url", f"{services.base}/bench/events"]
+    if args.real_limits:
+        cmd.append("--real-limits")
+    started = time.perf_counter()
+    with open(os.path.join(workdir, f"{scenario}.log"), "a") as log:
+        proc = subprocess.run(cmd, cwd=workdir, env=child_env(services, scenario, workdir, args.real_limits),
+                              stdout=log, stderr=subprocess.STDOUT, timeout=args.timeout)
+    result = {"scenario": scenario, "size": size, "process_seconds": round(time.perf_counter() - started, 3)}
+    if proc.returncode != 0 or not os.path.exists(result_path):
+        result["error"] = f"exit {proc.returncode}, 로그: {os.path.join(workdir, scenario + '.log')}"
+    else:
+        with open(result_path) as f:
+            result.update(json.load(f))
+    result.update(services.stats())
+    return result
+
+
+# ---- 봇 프로세스 쪽 ----
+
+def unthrottle_slack():
+    """Slack Tier 버킷을 사실상 무제한으로 (버킷이 만들어지기 전에 호출)"""
+    import rate_limit
+    rate_limit.SLACK_TIER_PER_MINUTE = dict.fromkeys(rate_limit.SLACK_TIER_PER_MINUTE, 10 ** 8)
+    rate_limit.SLACK_POST_PER_MINUTE = 10 ** 8
+
+
+def run_cheer(event_count, events_url):
+    """
+    Socket Mode 이벤트 envelope를 SocketModeClient의 수신 큐에 직접 넣어 실제 리스너 경로를 태웁니다.
+    (WebSocket 연결만 건너뜀) ack는 가로채서 envelope를 넣은 시점부터의 지연을 잽니다.
+    """
+    import urllib.request
+    import cheer_bot
+
+    with urllib.request.urlopen(f"{events_url}?n={event_count}") as response:
+        events = json.load(response)
+    enqueued, acked = {}, []
+
+    def record_ack(response):
+        acked.append(time.perf_counter() - enqueued[response.envelope_id])
+
+    cheer_bot.socket_client.send_socket_mode_response = record_ack
+    cheer_bot.start_event_workers()
+    for i, event in enumerate(events):
+        envelope_id = f"bench-{i}"
+        enqueued[envelope_id] = time.perf_counter()
+        cheer_bot.socket_client.message_queue.put(json.dumps({
+            "envelope_id": envelope_id, "type": "events_api", "accepts_response_payload": False,
+            "payload": {"type": "event_callback", "event": dict(event, type="message")},
+        }, ensure_ascii=False))
+    while len(acked) < len(events):
+        time.sleep(0.01)
+    cheer_bot.event_queue.join()
+    acked.sort()
+    return {
+        "events": len(events),
+        "ack_p50_ms": round(acked[len(acked) // 2] * 1000, 2) if acked else None,
+        "ack_p99_ms": round(acked[min(len(acked) - 1, int(len(acked) * 0.99))] * 1000, 2) if acked else None,
+        "dropped_events": cheer_bot.dropped_events,
+    }
+
+
+def child_main(args):
+    import resource
+
+    if not args.real_limits:
+        unthrottle_slack()
+    started = time.perf_counter()
+    extra = {}
+    if args.child in ("summary", "summary-incremental"):
+        import summary_bot
+        imported = time.perf_counter()
+        summary_bot.generate_daily_summary(CHANNEL, incremental=args.child == "summary-incremental")
+    elif args.child == "productivity":
+        import productivity_bot
+        imported = time.perf_counter()
+        productivity_bot.run_productivity(CHANNEL)
+    else:
+        import cheer_bot  # noqa: F401
+        imported = time.perf_counter()
+        extra = run_cheer(args.events, args.events_url)
+    finished = time.perf_counter()
+    result = {
+        "wall_seconds": round(finished - started, 3),
+        "import_seconds": round(imported - started, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    result.update(extra)
+    with open(args.result_file, "w") as f:
+        json.dump(result, f)
+
+
+# ---- 비교 ----
+
+def compare(results, baseline_path, threshold):
+    """baseline과 같은 (시나리오, 크기, 실행) 결과를 비교해 threshold 넘게 나빠진 항목 수를 반환합니다."""
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["size"], r.get("run", "cold")): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\n[baseline 비교: {baseline_path}]")
+    for r in results:
+        base = baseline.get((r["scenario"], r["size"], r.get("run", "cold")))
+        if not base or "error" in r or "error" in base:
+            continue
+        for metric in COMPARE_METRICS:
+            old, new = base.get(metric), r.get(metric)
+            if not old or new is None:
+                continue
+            change = new / old - 1
+            flag = ""
+            if change > threshold:
+                flag = " ❌"
+                regressions += 1
+            print(f"  {r['scenario']:<20} {r['size']:>7} {r.get('run', 'cold'):<5} {metric:<16} "
+                  f"{old:>10} → {new:<10} ({change:+.0%}){flag}")
+    return regressions
+
+
+def check_ack_latency(results, max_ack_ms):
+    """cheer 시나리오의 ack p99가 max_ack_ms를 넘은 결과 수를 반환합니다."""
+    slow = 0
+    for r in results:
+        if r.get("ack_p99_ms") is not None and r["ack_p99_ms"] > max_ack_ms:
+            print(f"❌ {r['scenario']} {r['size']} {r.get('run', 'cold')}: ack p99 {r['ack_p99_ms']}ms > {max_ack_ms}ms")
+            slow += 1
+    return slow
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100,1000", help="합성 채널 메시지 수 (쉼표 구분, 100~100000)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--slack-latency", type=float, default=0.0)
+    parser.add_argument("--openai-latency", type=float, default=0.0)
+    parser.add_argument("--notion-latency", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="가짜 OpenAI 생성 속도 (0이면 즉시)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="모든 서비스의 429 응답 비율")
+    parser.add_argument("--retry-after", type=float, default=1, help="429 응답의 Retry-After(초)")
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    parser.add_argument("--max-events", type=int, default=500, help="cheer 시나리오 이벤트 수 상한")
+    parser.add_argument("--max-ack-ms", type=float, default=1000,
+                        help="cheer 시나리오 ack p99가 이보다 길면 종료 코드 1 (Slack은 3초 안에 ack가 없으면 재전송)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warm", action="store_true", help="같은 .cache로 한 번 더 실행 (캐시 재사용 경로)")
+    parser.add_argument("--real-limits", action="store_true", help="rate_limit의 실제 분당 한도 적용")
+    parser.add_argument("--timeout", type=float, default=3600, help="시나리오 하나의 최대 실행 시간(초)")
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--fail-over", type=float, default=None, help="이 비율 넘게 나빠지면 종료 코드 1")
+    # 봇 프로세스용 (직접 쓰지 않음)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    parser.add_argument("--events", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--events-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args)
+        return
+
+    from fake_services import FakeConfig, FakeServices
+    from synthetic import generate_channel
+    from message_store import today_start_ts
+
+    config = FakeConfig(
+        latency={"slack": args.slack_latency, "openai": args.openai_latency, "notion": args.notion_latency},
+        rate_429=dict.fromkeys(("slack", "openai", "notion"), args.rate_429),
+        retry_after=args.retry_after, tokens_per_second=args.tokens_per_second,
+        embedding_dim=args.embedding_dim, seed=args.seed,
+    )
+    services = FakeServices(config).start()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    results = []
+    try:
+        for size in sizes:
+            # 오늘 자정~1분 전 사이에 메시지를 흩뿌림 (봇은 오늘 메시지만 읽음)
+            now = time.time()
+            services.load_channel(CHANNEL, generate_channel(size, today_start_ts(), now - 60, seed=args.seed))
+            for scenario in scenarios:
+                with tempfile.TemporaryDirectory(prefix=f"bench-{scenario}-{size}-") as workdir:
+                    for run in ["cold", "warm"] if args.warm else ["cold"]:
+                        result = run_scenario(services, scenario, size, workdir, args)
+                        result["run"] = run
+                        results.append(result)
+                        status = result.get("error") or (
+                            f"{result['wall_seconds']:.2f}s, RSS {result['peak_rss_mb']}MB, "
+                            f"API {result['api_calls_total']}회 (429 {sum(result['throttled'].values())}), "
+                            f"토큰 {result['tokens_sent']:,}")
+                        print(f"⏱️ {scenario:<20} {size:>7} {run:<5} {status}", flush=True)
+                        if "error" in result:
+                            with open(os.path.join(workdir, f"{scenario}.log")) as f:
+                                print("".join(f.readlines()[-20:]))
+    finally:
+        services.stop()
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": dict(config.to_dict(), real_limits=args.real_limits, max_events=args.max_events),
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 결과 저장: {args.out}")
+    slow_acks = check_ack_latency(results, args.max_ack_ms)
+    regressions = 0
+    if args.compare:
+        regressions = compare(results, args.compare, args.fail_over if args.fail_over is not None else 0.2)
+    if slow_acks or (args.fail_over is not None and regressions):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# 벤치마크용 합성 채널: 실제 팀 채널처럼 잡담, 결정/할 일, 이모지만 있는 답, 붙여 넣은 로그/코드,
+# 링크와 멘션, 거의 같은 알림 반복, 봇 메시지, 스레드를 섞어 만듭니다. 같은 seed면 항상 같은 채널.
+
+import random
+
+TARGET_USER = "U08TA111MPH"  # cheer_bot.TARGET_USER_IDS
+BOT_ID = "BBENCH"
+
+TOPICS = ["배포", "로그인 API", "결제 모듈", "대시보드", "온보딩 문서", "알림 서버", "검색 인덱스", "모바일 앱",
+          "데이터 파이프라인", "CI 설정", "권한 관리", "캐시 레이어"]
+TASKS = ["리뷰", "테스트 작성", "문서 정리", "성능 측정", "버그 수정", "마이그레이션", "모니터링 추가", "롤백 계획 작성"]
+DAYS = ["오늘", "내일", "수요일", "금요일", "다음 주 월요일"]
+CHATTER = ["점심 뭐 먹을까요?", "오늘 날씨 좋네요", "커피 드실 분?", "회의실 어디였죠?", "주말 잘 보내셨어요?",
+           "네 알겠습니다", "넵", "확인했습니다", "감사합니다!", "좋아요"]
+LOW_CONTENT = ["ㅋㅋㅋ", "ㅋㅋㅋㅋㅋ", ":+1:", ":tada::tada:", "👍", "ㅎㅎ", ":pray:", "!!"]
+
+
+def _decision(rng):
+    return (f"{rng.choice(TOPICS)} 관련 결정: {rng.choice(DAYS)} {rng.choice(['오전', '오후'])} "
+            f"{rng.randint(1, 11)}시에 {rng.choice(['진행', '배포', '적용'])}하기로 했습니다.")
+
+
+def _task(rng, users):
+    return (f"<@{rng.choice(users)}> {rng.choice(TOPICS)} {rng.choice(TASKS)} {rng.choice(DAYS)}까지 "
+            f"{rng.choice(['부탁드립니다', '해 주실 수 있을까요?', '제가 할게요'])}")
+
+
+def _done(rng):
+    return f"{rng.choice(TOPICS)} {rng.choice(TASKS)} 완료했어요. PR 올렸습니다"
+
+
+def _question(rng):
+    return f"{rng.choice(TOPICS)} {rng.choice(['장애', '지연', '에러'])} 원인 아시는 분 계신가요? 어제부터 계속 나네요"
+
+
+def _link(rng):
+    n = rng.randint(100, 9999)
+    return (f"{rng.choice(TOPICS)} 참고 자료입니다 <https://github.com/example/app/pull/{n}?notification_referrer_id="
+            f"NT_kwDOA{n}&utm_source=slack> 그리고 <https://docs.example.com/wiki/spaces/ENG/pages/{n * 37}/"
+            f"{rng.choice(TOPICS)}-design-review-notes|설계 문서> 확인 부탁드려요 :eyes:")
+
+
+def _log(rng):
+    lines = [f"2024-05-{rng.randint(1, 28):02d} 12:{i // 60:02d}:{i % 60:02d} {rng.choice(['INFO', 'WARN', 'ERROR'])} "
+             f"worker-{rng.randint(1, 8)} request_id={rng.getrandbits(64):016x} latency_ms={rng.randint(3, 900)}"
+             for i in range(rng.randint(20, 120))]
+    fenced = rng.random() < 0.5
+    body = "\n".join(lines)
+    return f"{rng.choice(TOPICS)}에서 에러 로그 나왔습니다\n" + (f"```{body}```" if fenced else body)
+
+
+def _alert(rng):
+    return (f"[알림] {rng.choice(['prod', 'staging'])} {rng.choice(TOPICS)} 빌드 #{rng.randint(1000, 1010)} "
+            f"실패했습니다. 담당자 확인 부탁드립니다.")
+
+
+KINDS = [  # (가중치, 생성 함수)
+    (20, lambda rng, users: rng.choice(CHATTER)),
+    (12, lambda rng, users: _decision(rng)),
+    (12, _task),
+    (8, lambda rng, users: _done(rng)),
+    (8, lambda rng, users: _question(rng)),
+    (10, lambda rng, users: rng.choice(LOW_CONTENT)),
+    (8, lambda rng, users: _link(rng)),
+    (4, lambda rng, users: _log(rng)),
+    (10, lambda rng, users: _alert(rng)),
+]
+
+
+def generate_channel(size, start_ts, end_ts, seed=0, user_count=50, thread_ratio=0.1, bot_ratio=0.05):
+    """
+    start_ts~end_ts 사이에 size개 메시지(스레드 답글 제외)를 만듭니다.
+    {"messages": 오래된 순 목록, "replies": {부모 ts: 답글 목록}, "users": 사용자 목록}을 반환합니다.
+    """
+    rng = random.Random(seed)
+    users = [TARGET_USER] + [f"U{i:08d}" for i in range(1, user_count)]
+    weights = [w for w, _ in KINDS]
+    makers = [fn for _, fn in KINDS]
+    span = max(end_ts - start_ts, 1.0)
+    times = sorted(start_ts + rng.random() * span for _ in range(size))
+    messages, replies, used = [], {}, set()
+    for t in times:
+        ts = f"{t:.6f}"
+        while ts in used:
+            t += 0.000001
+            ts = f"{t:.6f}"
+        used.add(ts)
+        text = rng.choices(makers, weights)[0](rng, users)
+        message = {"type": "message", "ts": ts, "text": text, "user": rng.choice(users)}
+        if rng.random() < bot_ratio:
+            message.pop("user")
+            message["bot_id"] = BOT_ID
+        elif rng.random() < thread_ratio:
+            thread = []
+            reply_t = t
+            for _ in range(rng.randint(1, 6)):
+                reply_t = min(reply_t + rng.uniform(30, 3600), end_ts)
+                reply_ts = f"{reply_t:.6f}"
+                while reply_ts in used:
+                    reply_t += 0.000001
+                    reply_ts = f"{reply_t:.6f}"
+                used.add(reply_ts)
+                thread.append({"type": "message", "ts": reply_ts, "thread_ts": ts, "user": rng.choice(users),
+                               "text": rng.choice(CHATTER + [_done(rng), _decision(rng)])})
+            message.update(thread_ts=ts, reply_count=len(thread), latest_reply=thread[-1]["ts"])
+            replies[ts] = thread
+        messages.append(message)
+    return {"messages": messages, "replies": replies, "users": users}
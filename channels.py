@@ -0,0 +1,65 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import get_slack_client, CHANNEL_ID
+
+CHANNEL_MAX_WORKERS = int(os.getenv("CHANNEL_MAX_WORKERS", "4"))
+
+
+def discover_channels(client=None):
+    """봇이 참여 중인 (보관되지 않은) 채널 ID 목록을 conversations_list로 찾습니다."""
+    client = client or get_slack_client()
+    channels, cursor = [], None
+    while True:
+        kwargs = {"types": "public_channel,private_channel", "exclude_archived": True, "limit": 200}
+        if cursor:
+            kwargs["cursor"] = cursor
+        response = client.conversations_list(**kwargs)
+        channels.extend(c["id"] for c in response["channels"] if c.get("is_member"))
+        cursor = response.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            return channels
+
+
+def resolve_channels(argv=None):
+    """
+    처리할 채널 목록을 정합니다. 우선순위:
+    --all-channels (봇이 참여한 모든 채널) > --channels C1,C2 > 환경변수 CHANNEL_IDS > CHANNEL_ID
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", help="쉼표로 구분한 채널 ID 목록")
+    parser.add_argument("--all-channels", action="store_true", help="봇이 참여한 모든 채널")
+    args, _ = parser.parse_known_args(argv)
+    if args.all_channels:
+        return discover_channels()
+    raw = args.channels or os.getenv("CHANNEL_IDS") or CHANNEL_ID or ""
+    return [c.strip() for c in raw.split(",") if c.strip()]
+
+
+def run_for_channels(fn, channels, max_workers=None):
+    """
+    채널마다 fn(channel)을 동시에 실행합니다. 한 채널이 실패해도 다른 채널은 계속 진행하고,
+    끝나면 채널별 소요 시간과 전체 소요 시간을 출력합니다. {채널: 결과 또는 예외}를 반환합니다.
+    """
+    def timed(channel):
+        start = time.monotonic()
+        try:
+            return channel, fn(channel), None, time.monotonic() - start
+        except Exception as e:
+            return channel, None, e, time.monotonic() - start
+
+    started = time.monotonic()
+    results = {}
+    print(f"📡 채널 {len(channels)}개 처리 시작")
+    with ThreadPoolExecutor(max_workers=max_workers or CHANNEL_MAX_WORKERS) as pool:
+        outcomes = list(pool.map(timed, channels))
+    print("\n[채널별 처리 시간]")
+    for channel, result, error, seconds in sorted(outcomes, key=lambda o: -o[3]):
+        status = f"❌ 실패: {error}" if error else "✅"
+        print(f"  {channel}: {seconds:.1f}초 {status}")
+        results[channel] = error if error else result
+    failed = sum(1 for o in outcomes if o[2])
+    print(f"전체 {time.monotonic() - started:.1f}초 (성공 {len(outcomes) - failed}, 실패 {failed})")
+    return results
@@ -2,33 +2,45 @@
 
 import time
 import os
-import json
+import queue
+from collections import OrderedDict
 from datetime import datetime
-from slack_sdk import WebClient
 from slack_sdk.socket_mode import SocketModeClient
-from slack_sdk.socket_mode.request import SocketModeRequest
 from slack_sdk.socket_mode.response import SocketModeResponse
-from utils import generate_ai_response, add_clap_reaction
+from utils import generate_ai_response, stream_chat_completion, add_clap_reaction, get_slack_client, get_openai_client
+from live_message import LiveMessage
+from responded_index import RespondedIndex
+from user_directory import get_user_directory
 import threading
-from flask import Flask
 
 SLACK_BOT_TOKEN = os.environ["SLACK_BOT_TOKEN"]
 SLACK_APP_TOKEN = os.environ["SLACK_APP_TOKEN"]
 BOT_USER_ID = os.environ.get("BOT_USER_ID")
 TARGET_USER_IDS = ["U08TA111MPH"]  # Cheolho Kang님, 추가 유저
-RESPONDED_MESSAGES_FILE = "responded_messages.json"
+RESPONDED_MESSAGES_FILE = "responded_messages.json"  # 예전 형식, 시작할 때 저널로 옮김
+RESPONDED_JOURNAL_FILE = "responded_messages.log"
+CHEER_WORKERS = int(os.environ.get("CHEER_WORKERS", "4"))
+EVENT_QUEUE_SIZE = int(os.environ.get("EVENT_QUEUE_SIZE", "100"))
+SEEN_EVENTS_LIMIT = 10000  # 중복 확인용으로 기억할 최근 이벤트 수
+CHEER_STREAMING = os.environ.get("CHEER_STREAMING", "0").lower() in ("1", "true", "yes")  # 답글을 먼저 달고 토큰 단위로 갱신
 
-def load_responded_messages():
-    if os.path.exists(RESPONDED_MESSAGES_FILE):
-        with open(RESPONDED_MESSAGES_FILE, 'r') as f:
-            return json.load(f)
-    return []
+event_queue = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
+seen_events = OrderedDict()
+seen_events_lock = threading.Lock()
+dropped_events = 0  # 큐가 가득 차 버린 이벤트 수
+_responded_index = None
+_responded_index_lock = threading.Lock()
+
+def get_responded_index():
+    """응답 기록은 처음 쓸 때 읽음 (import만 해도 저널을 다시 쓰거나 예전 파일 이름을 바꾸지 않도록)"""
+    global _responded_index
+    with _responded_index_lock:
+        if _responded_index is None:
+            _responded_index = RespondedIndex(RESPONDED_JOURNAL_FILE, legacy_path=RESPONDED_MESSAGES_FILE)
+    return _responded_index
 
 def save_responded_message(message_id):
-    responded = load_responded_messages()
-    responded.append(message_id)
-    with open(RESPONDED_MESSAGES_FILE, 'w') as f:
-        json.dump(responded, f)
+    get_responded_index().add(message_id)
 
 def should_respond_to_message(msg):
     print(f"[DEBUG] 수신 메시지: {msg}", flush=True)
@@ -41,8 +53,7 @@ def should_respond_to_message(msg):
         print(f"[DEBUG] 필터: 스레드/댓글 메시지 (ts={msg['ts']}, thread_ts={msg['thread_ts']})", flush=True)
         return False
     # 3. 이미 응답한 메시지에는 또 반응하지 않음
-    responded = load_responded_messages()
-    if msg["ts"] in responded:
+    if msg["ts"] in get_responded_index():
         print(f"[DEBUG] 필터: 이미 응답한 메시지 (ts={msg['ts']})", flush=True)
         return False
     # 4. 텍스트 없는 메시지 제외
@@ -53,15 +64,11 @@ def should_respond_to_message(msg):
     return True
 
 def get_user_display_name(user_id):
-    try:
-        user_info = client.users_info(user=user_id)
-        return user_info["user"]["profile"].get("display_name") or user_info["user"]["profile"].get("real_name")
-    except Exception as e:
-        print(f"[DEBUG] 닉네임 조회 실패: {e}", flush=True)
-        return "사용자"
+    # 시작할 때 users_list로 채운 캐시에서 찾고, 없거나 만료된 경우만 users_info 호출
+    return user_directory.display_name(user_id)
 
-def generate_cheer_message(user_message, user_display_name):
-    prompt = f"""
+def cheer_prompt(user_message, user_display_name):
+    return f"""
     다음은 {user_display_name}님이 작성한 메시지입니다. 이 메시지에 대해 강한 동의와 아부(칭찬, 감탄, 적극적 공감 등)를 섞어, 친근하고 격려하는 응원 메시지를 작성해주세요.
     메시지는 2-3줄 이내로 간단하게 작성해주세요.
     
@@ -69,37 +76,110 @@ def generate_cheer_message(user_message, user_display_name):
     {user_message}
     
     """
-    return generate_ai_response(prompt)
 
-client = WebClient(token=SLACK_BOT_TOKEN)
-socket_client = SocketModeClient(app_token=SLACK_APP_TOKEN, web_client=client)
+def generate_cheer_message(user_message, user_display_name):
+    return generate_ai_response(cheer_prompt(user_message, user_display_name))
+
+def stream_cheer_message(msg, user_display_name):
+    """
+    스레드에 자리표시 답글을 먼저 달고, 스트리밍으로 받은 토큰을 chat_update로 이어 붙입니다.
+    완성된 응원 메시지(없으면 빈 문자열)를 반환합니다.
+    """
+    header = f"*[{datetime.now().strftime('%Y-%m-%d %H:%M')}] 응원 메시지*\n\n"
+    live = LiveMessage(client, msg["channel"], header + "✍️ ...", thread_ts=msg["ts"])
+    text = ""
+    try:
+        for piece in stream_chat_completion(
+                [{"role": "user", "content": cheer_prompt(msg["text"], user_display_name)}], temperature=0.7):
+            text += piece
+            live.update(header + text)
+    except Exception as e:
+        print(f"[DEBUG] 스트리밍 실패 (ts={msg['ts']}): {e}", flush=True)
+    if text.strip():
+        live.finish(header + text.strip())
+    else:
+        live.delete()
+    return text.strip()
+
+client = get_slack_client()  # utils와 같은 클라이언트 (SLACK_BOT_TOKEN)
+socket_client = SocketModeClient(app_token=SLACK_APP_TOKEN, web_client=client.web_client)
+user_directory = get_user_directory(client)
+
+def process_message_event(msg):
+    """워커 스레드에서 실행: 필터 확인 후 응원 메시지를 생성해 스레드에 답니다."""
+    if should_respond_to_message(msg):
+        user_display_name = get_user_display_name(msg["user"])
+        print(f"[DEBUG] 응원 메시지 생성 시작 (ts={msg['ts']}, user={user_display_name})", flush=True)
+        if CHEER_STREAMING:
+            cheer_message = stream_cheer_message(msg, user_display_name)
+        else:
+            cheer_message = generate_cheer_message(msg["text"], user_display_name)
+            if cheer_message:
+                print(f"[DEBUG] 응원 메시지 전송 (ts={msg['ts']})", flush=True)
+                current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
+                message = f"*[{current_time}] 응원 메시지*\n\n{cheer_message}"
+                client.chat_postMessage(channel=msg["channel"], text=message, thread_ts=msg["ts"])
+        if cheer_message:
+            add_clap_reaction(msg["ts"], channel=msg["channel"])
+            save_responded_message(msg["ts"])
+        else:
+            print(f"[DEBUG] 응원 메시지 생성 실패 (ts={msg['ts']})", flush=True)
+
+def mark_event_seen(msg):
+    """(channel, ts) 기준으로 처음 보는 이벤트면 True. Slack 재전송 envelope는 False."""
+    key = (msg.get("channel"), msg.get("ts"))
+    with seen_events_lock:
+        if key in seen_events:
+            return False
+        seen_events[key] = time.time()
+        if len(seen_events) > SEEN_EVENTS_LIMIT:
+            seen_events.popitem(last=False)
+    return True
+
+def forget_event(msg):
+    """처리하지 못한 이벤트를 seen_events에서 빼서 다시 수신되면 처리되게 함"""
+    with seen_events_lock:
+        seen_events.pop((msg.get("channel"), msg.get("ts")), None)
+
+def event_worker():
+    while True:
+        msg = event_queue.get()
+        try:
+            process_message_event(msg)
+        except Exception as e:
+            print(f"[DEBUG] 이벤트 처리 실패 (ts={msg.get('ts')}): {e}", flush=True)
+        finally:
+            event_queue.task_done()
+
+def start_event_workers(count=CHEER_WORKERS):
+    get_responded_index()  # 첫 이벤트를 처리하기 전에 저널을 읽어 둠
+    for i in range(count):
+        threading.Thread(target=event_worker, name=f"cheer-worker-{i}", daemon=True).start()
 
 def handle_events_api(client, req):
+    global dropped_events
     print(f"[DEBUG] 이벤트 수신: type={req.type}", flush=True)
     if req.type == "events_api":
+        # 3초 안에 응답하지 않으면 Slack이 재전송하므로 먼저 ack 후 워커에 넘김
+        client.send_socket_mode_response(SocketModeResponse(envelope_id=req.envelope_id))
         event = req.payload["event"]
         print(f"[DEBUG] 이벤트 payload: {event}", flush=True)
         if event["type"] == "message":
-            msg = event
-            if should_respond_to_message(msg):
-                user_display_name = get_user_display_name(msg["user"])
-                print(f"[DEBUG] 응원 메시지 생성 시작 (ts={msg['ts']}, user={user_display_name})", flush=True)
-                cheer_message = generate_cheer_message(msg["text"], user_display_name)
-                if cheer_message:
-                    print(f"[DEBUG] 응원 메시지 전송 (ts={msg['ts']})", flush=True)
-                    current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
-                    message = f"*[{current_time}] 응원 메시지*\n\n{cheer_message}"
-                    client.web_client.chat_postMessage(channel=msg["channel"], text=message, thread_ts=msg["ts"])
-                    add_clap_reaction(msg["ts"])
-                    save_responded_message(msg["ts"])
-                else:
-                    print(f"[DEBUG] 응원 메시지 생성 실패 (ts={msg['ts']})", flush=True)
-        # 이벤트 응답
-        client.send_socket_mode_response(SocketModeResponse(envelope_id=req.envelope_id))
+            if not mark_event_seen(event):
+                print(f"[DEBUG] 필터: 중복 수신 이벤트 (ts={event.get('ts')})", flush=True)
+                return
+            try:
+                # 리스너 스레드가 기다리면 뒤에 쌓인 envelope의 ack가 늦어지므로 큐가 가득 차면 바로 버림
+                event_queue.put_nowait(event)
+            except queue.Full:
+                dropped_events += 1
+                forget_event(event)
+                print(f"⚠️ [WARN] 이벤트 큐가 가득 차 이벤트를 버립니다 (ts={event.get('ts')})", flush=True)
 
 socket_client.socket_mode_request_listeners.append(handle_events_api)
 
 def run_dummy_server():
+    from flask import Flask
     app = Flask(__name__)
 
     @app.route("/")
@@ -115,10 +195,14 @@ if __name__ == "__main__":
     print("[DEBUG] TARGET_USER_IDS:", TARGET_USER_IDS, flush=True)
     print("[DEBUG] OPENAI_API_KEY:", os.environ.get("OPENAI_API_KEY"), flush=True)
     print("[DEBUG] CHANNEL_ID:", os.environ.get("CHANNEL_ID"), flush=True)
-    threading.Thread(target=run_dummy_server, daemon=True).start()
+    start_event_workers()
     print("🚀 Cheer Up Bot (Socket Mode) Started!", flush=True)
     socket_client.connect()
     print("✅ Socket Mode WebSocket 연결 시도 완료 (이후 이벤트가 오면 정상 연결)", flush=True)
+    # 연결을 먼저 하고, Flask/OpenAI import와 사용자 목록 조회는 그 다음에 (이벤트 처리와 겹쳐도 됨)
+    threading.Thread(target=run_dummy_server, daemon=True).start()
+    threading.Thread(target=get_openai_client, daemon=True).start()
+    user_directory.warm()
     import time
     while True:
         time.sleep(10)
\ No newline at end of file
@@ -0,0 +1,80 @@
+import re
+from collections import defaultdict
+from itertools import combinations
+
+COMPLETION_MARKERS = ["완료", "했어요", "PR", "merge", "끝", "처리"]
+MAX_KEYWORDS = 5  # Action Item 하나에서 사용할 최대 키워드 수
+
+# 한글 토큰 끝의 조사를 떼어 "문서를"/"문서는"이 같은 토큰이 되도록 함 (긴 것부터 검사)
+JOSA = sorted(["으로", "에서", "까지", "부터", "에게", "하고", "이랑", "을", "를", "이", "가", "은", "는",
+               "에", "의", "로", "와", "과", "도", "만"], key=len, reverse=True)
+STOPWORDS = {"오늘", "내일", "이번", "다음", "관련", "진행", "확인", "해서", "하기", "the", "and", "for", "to"}
+TOKEN_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+ITEM_PREFIX_RE = re.compile(r"^\s*[-*•]?\s*(\[[^\]]*\])?\s*")
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if "가" <= token[0] <= "힣":
+            for josa in JOSA:
+                if token.endswith(josa) and len(token) - len(josa) >= 2:
+                    token = token[:-len(josa)]
+                    break
+        if len(token) >= 2 and token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def marker_pattern(markers):
+    """
+    완료 표시 단어들을 한 번에 찾는 정규식.
+    영문 표시는 앞뒤가 영문자가 아닐 때만 찾음 ('PR'이 'PRODUCT'에 걸리지 않게). 한글 조사는 \\w라서
+    \\b로 감싸면 "PR을 올렸습니다"를 놓치므로 쓰지 않음. 'merge'처럼 소문자 단어는 "merged"도 잡도록 앞만 검사.
+    """
+    parts = []
+    for marker in sorted(markers, key=len, reverse=True):
+        escaped = re.escape(marker)
+        if not marker.isascii():
+            parts.append(escaped)
+        elif marker.isupper():
+            parts.append(rf"(?<![A-Za-z]){escaped}(?![A-Za-z])")
+        else:
+            parts.append(rf"(?<![A-Za-z]){escaped}")
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+
+class CompletionIndex:
+    """
+    메시지 텍스트로 하루(또는 여러 날) 단위 역색인(token -> 메시지 번호)을 한 번 만들고,
+    완료 표시가 있는 메시지 집합을 정규식 한 번의 스캔으로 구해 둡니다.
+    Action Item은 키워드 여러 개가 함께 나온 완료 메시지가 있으면 완료로 봅니다.
+    """
+
+    def __init__(self, texts, markers=COMPLETION_MARKERS):
+        pattern = marker_pattern(markers)
+        self.completed = {i for i, text in enumerate(texts) if pattern.search(text)}
+        self.postings = defaultdict(set)
+        for i in self.completed:
+            for token in tokenize(texts[i]):
+                self.postings[token].add(i)
+
+    @staticmethod
+    def keywords(item):
+        """Action Item 줄에서 "- [담당자]" 머리를 떼고 키워드를 뽑습니다."""
+        return list(dict.fromkeys(tokenize(ITEM_PREFIX_RE.sub("", item, count=1))))[:MAX_KEYWORDS]
+
+    def is_completed(self, item):
+        keywords = self.keywords(item)
+        if not keywords:
+            return False
+        postings = [self.postings[k] for k in keywords if k in self.postings]
+        if len(keywords) == 1:
+            return bool(postings)
+        # 키워드 두 개 이상이 같은 완료 메시지에 함께 나오는지 (isdisjoint는 공통 원소를 찾는 즉시 끝남)
+        return any(not a.isdisjoint(b) for a, b in combinations(postings, 2))
+
+    def completion_ratio(self, action_items):
+        if not action_items:
+            return 0.0
+        return sum(1 for item in action_items if self.is_completed(item)) / len(action_items)
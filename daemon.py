@@ -0,0 +1,164 @@
+# 요약/생산성 작업(및 선택적으로 응원 봇 리스너)을 한 프로세스에 띄워 두는 상주 스케줄러
+#
+# 사용 예:
+#   DAEMON_SCHEDULE="summary=18:00;productivity=weekdays 18:05" python daemon.py --with-cheer
+#   SUMMARY_INCREMENTAL=1 DAEMON_SCHEDULE="summary-partial=hourly :05;summary=18:00" python daemon.py
+#   curl -X POST localhost:10000/run/summary   # 수동 실행
+
+import argparse
+import os
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime
+from functools import partial
+from zoneinfo import ZoneInfo
+
+import schedule
+from flask import Flask, jsonify
+
+import productivity_bot
+import summary_bot
+
+TIMEZONE = "Asia/Seoul"
+DAEMON_SCHEDULE = os.getenv("DAEMON_SCHEDULE", "summary=18:00;productivity=18:00")
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", os.getenv("PORT", "10000")))
+
+JOBS = {
+    "summary": summary_bot.main,
+    "summary-partial": partial(summary_bot.main, partial=True),  # 매시 부분 요약 (SUMMARY_INCREMENTAL과 함께)
+    "productivity": productivity_bot.main,
+}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+WEEKDAY_ALIASES = {day[:3]: day for day in WEEKDAYS}
+WEEKDAY_ALIASES.update({"weekdays": WEEKDAYS[:5], "weekends": WEEKDAYS[5:], "mon-fri": WEEKDAYS[:5]})
+
+job_queue = queue.Queue()
+job_status = {name: {"state": "idle", "last_started": None, "last_seconds": None, "last_error": None}
+              for name in JOBS}
+status_lock = threading.Lock()
+
+
+def now_kst():
+    return datetime.now(ZoneInfo(TIMEZONE)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def enqueue(name, reason="schedule"):
+    """작업을 실행 큐에 넣습니다. 이미 대기/실행 중이면 건너뜁니다."""
+    with status_lock:
+        if job_status[name]["state"] != "idle":
+            print(f"⏭️ {name} 작업이 이미 {job_status[name]['state']} 상태라 건너뜁니다.", flush=True)
+            return False
+        job_status[name]["state"] = "queued"
+    print(f"🗓️ [{now_kst()}] {name} 작업 예약 ({reason})", flush=True)
+    job_queue.put(name)
+    return True
+
+
+def job_runner():
+    """작업을 한 번에 하나씩 실행합니다. 클라이언트와 캐시는 프로세스에 남아 다음 실행에 재사용됩니다."""
+    while True:
+        name = job_queue.get()
+        started = time.monotonic()
+        with status_lock:
+            job_status[name].update(state="running", last_started=now_kst(), last_error=None)
+        try:
+            JOBS[name]()
+        except Exception as e:
+            traceback.print_exc()
+            with status_lock:
+                job_status[name]["last_error"] = str(e)
+        finally:
+            with status_lock:
+                job_status[name].update(state="idle", last_seconds=round(time.monotonic() - started, 1))
+            print(f"🏁 {name} 작업 종료 ({job_status[name]['last_seconds']}초)", flush=True)
+            job_queue.task_done()
+
+
+def schedule_job(name, spec):
+    """
+    spec 형식: "18:00"(매일), "mon 09:30", "weekdays 18:00", "hourly :05"(매시 5분).
+    시각은 모두 Asia/Seoul 기준입니다.
+    """
+    parts = spec.split()
+    if parts[0] == "hourly":
+        schedule.every().hour.at(parts[1] if len(parts) > 1 else ":00").do(enqueue, name)
+        return
+    if len(parts) == 1:
+        schedule.every().day.at(parts[0], TIMEZONE).do(enqueue, name)
+        return
+    days = WEEKDAY_ALIASES.get(parts[0], parts[0])
+    for day in days if isinstance(days, list) else [days]:
+        getattr(schedule.every(), day).at(parts[1], TIMEZONE).do(enqueue, name)
+
+
+def load_schedule(config=DAEMON_SCHEDULE):
+    """DAEMON_SCHEDULE: "작업=spec[,spec];작업=spec" """
+    for entry in filter(None, (e.strip() for e in config.split(";"))):
+        name, _, specs = entry.partition("=")
+        name = name.strip()
+        if name not in JOBS:
+            raise ValueError(f"알 수 없는 작업: {name}")
+        for spec in filter(None, (s.strip() for s in specs.split(","))):
+            schedule_job(name, spec)
+            print(f"⏰ {name}: {spec} ({TIMEZONE})", flush=True)
+
+
+def create_app():
+    app = Flask(__name__)
+
+    @app.route("/")
+    def index():
+        return "OK"
+
+    @app.route("/jobs")
+    def jobs():
+        with status_lock:
+            return jsonify(job_status)
+
+    @app.route("/run/<name>", methods=["POST"])
+    def run(name):
+        if name not in JOBS:
+            return jsonify({"error": f"알 수 없는 작업: {name}"}), 404
+        queued = enqueue(name, reason="manual")
+        return jsonify({"job": name, "queued": queued}), 202 if queued else 409
+
+    return app
+
+
+def start_cheer_listener():
+    """응원 봇 Socket Mode 리스너를 같은 프로세스에서 시작합니다."""
+    import cheer_bot
+    cheer_bot.start_event_workers()
+    cheer_bot.socket_client.connect()
+    print("✅ Cheer Up Bot 리스너 연결 시도 완료", flush=True)
+    cheer_bot.user_directory.warm()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--with-cheer", action="store_true", help="응원 봇 리스너도 함께 실행")
+    parser.add_argument("--run-now", action="append", default=[], choices=sorted(JOBS), help="시작하자마자 실행할 작업")
+    args, _ = parser.parse_known_args()
+
+    load_schedule()
+    threading.Thread(target=job_runner, name="job-runner", daemon=True).start()
+    app = create_app()
+    threading.Thread(
+        target=lambda: app.run(host="0.0.0.0", port=DAEMON_PORT, debug=False), daemon=True).start()
+    if args.with_cheer:
+        start_cheer_listener()
+    for name in args.run_now:
+        enqueue(name, reason="--run-now")
+
+    print(f"🚀 스케줄러 데몬 시작 (수동 실행: POST :{DAEMON_PORT}/run/<작업>)", flush=True)
+    while True:
+        schedule.run_pending()
+        idle = schedule.idle_seconds()
+        time.sleep(30 if idle is None else min(max(idle, 1), 30))
+
+
+if __name__ == "__main__":
+    main()
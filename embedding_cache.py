@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "512"))
+
+
+class EmbeddingCache:
+    """
+    텍스트+모델 해시를 키로 임베딩을 디스크에 저장하는 캐시.
+    벡터는 float32 원시 파일(vectors.f32)에 행 단위로 이어 붙이고 memmap으로 읽으며,
+    키 -> [행 번호, 마지막 사용 시각] 인덱스는 index.json에 둡니다.
+    파일 크기가 max_bytes를 넘으면 오래 쓰이지 않은 항목부터 지우고 파일을 다시 씁니다.
+    같은 디렉터리를 여러 인스턴스가 쓰면 행 번호가 엇갈리므로 get_embedding_cache()로 공유해서 씁니다.
+    """
+
+    def __init__(self, model, cache_dir=None, max_bytes=None):
+        self.model = model
+        self.dir = os.path.join(cache_dir or CACHE_DIR, "embeddings", model.replace("/", "_"))
+        self.max_bytes = max_bytes if max_bytes is not None else EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+        self.index_path = os.path.join(self.dir, "index.json")
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.dim = None
+        self.rows = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            self.dim = data["dim"]
+            self.rows = data["rows"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"임베딩 캐시 인덱스를 읽지 못해 새로 시작합니다: {e}")
+            self.dim, self.rows = None, {}
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _stored_rows(self):
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+    def _open_vectors(self):
+        rows = self._stored_rows()
+        if not rows:
+            return None
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def get_many(self, texts):
+        """
+        캐시에 있는 텍스트의 벡터를 찾습니다.
+        ({texts 인덱스: 벡터}, 캐시에 없는 texts 인덱스 목록)을 반환합니다.
+        """
+        found, missing = {}, []
+        now = int(time.time())
+        with self.lock:
+            vectors = self._open_vectors()
+            for i, text in enumerate(texts):
+                entry = self.rows.get(self.key(text))
+                if entry is None or vectors is None or entry[0] >= len(vectors):
+                    missing.append(i)
+                    continue
+                entry[1] = now
+                found[i] = np.array(vectors[entry[0]])
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, texts, vectors):
+        """새로 받은 임베딩을 파일 끝에 추가하고 인덱스를 저장합니다."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(texts):
+            return
+        with self.lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            os.makedirs(self.dir, exist_ok=True)
+            start = self._stored_rows()
+            now = int(time.time())
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors).tobytes())
+            for offset, text in enumerate(texts):
+                self.rows[self.key(text)] = [start + offset, now]
+            if os.path.getsize(self.vectors_path) > self.max_bytes:
+                self._evict()
+            self.save()
+
+    def _evict(self):
+        """최근에 사용한 항목부터 용량의 80%까지만 남기고 벡터 파일을 다시 씁니다."""
+        keep = int(self.max_bytes * 0.8) // (self.dim * 4)
+        ordered = sorted(self.rows.items(), key=lambda kv: (kv[1][1], kv[1][0]), reverse=True)[:keep]
+        old = self._open_vectors()
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        rows = {}
+        with os.fdopen(fd, "wb") as f:
+            for new_row, (key, (row, used)) in enumerate(ordered):
+                f.write(np.ascontiguousarray(old[row]).tobytes())
+                rows[key] = [new_row, used]
+        del old
+        os.replace(tmp_path, self.vectors_path)
+        print(f"임베딩 캐시 정리: {len(self.rows) - len(rows)}개 항목 삭제")
+        self.rows = rows
+
+    def save(self):
+        with self.lock:
+            if self.dim is None:
+                return
+            os.makedirs(self.dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"dim": self.dim, "rows": self.rows}, f)
+            os.replace(tmp_path, self.index_path)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model):
+    """프로세스 전체에서 모델별로 공유하는 EmbeddingCache (여러 채널을 동시에 처리할 때도 인스턴스 하나)"""
+    with _caches_lock:
+        if model not in _caches:
+            _caches[model] = EmbeddingCache(model)
+        return _caches[model]
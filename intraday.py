@@ -0,0 +1,163 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from analysis import analyze_conversation, merge_analyses, texts_digest
+from message_store import get_store, today_start_ts
+from summarizer import SUMMARY_MAX_WORKERS
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+INTRADAY_DB_PATH = os.getenv("INTRADAY_DB_PATH", os.path.join(CACHE_DIR, "intraday.db"))
+INTRADAY_WINDOW = int(os.getenv("INTRADAY_WINDOW_MINUTES", "60")) * 60  # 초
+INTRADAY_KEEP_DAYS = 14
+
+
+def window_label(start, end):
+    tz = ZoneInfo("Asia/Seoul")
+    return f"{datetime.fromtimestamp(start, tz):%H:%M}~{datetime.fromtimestamp(end, tz):%H:%M}"
+
+
+def completed_windows(day_start, now):
+    """day_start부터 now 이전에 끝난 (start, end] 구간들"""
+    windows = []
+    start = day_start
+    while start + INTRADAY_WINDOW <= now:
+        windows.append((start, start + INTRADAY_WINDOW))
+        start += INTRADAY_WINDOW
+    return windows
+
+
+class PartialStore:
+    """
+    채널별·시간 구간별 부분 분석(요약, Action Item, 개수)을 로컬 SQLite에 보관합니다.
+    구간 키는 (channel, window_start)이고, 구간 메시지의 digest가 같으면 저장된 결과를 재사용합니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or INTRADAY_DB_PATH
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS partials (
+                    channel TEXT NOT NULL,
+                    window_start REAL NOT NULL,
+                    window_end REAL NOT NULL,
+                    digest TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (channel, window_start)
+                )
+                """
+            )
+
+    def get(self, channel, window_start):
+        """저장된 (digest, 분석 결과) 또는 None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT digest, analysis FROM partials WHERE channel = ? AND window_start = ?", (channel, window_start)
+            ).fetchone()
+        return (row["digest"], json.loads(row["analysis"])) if row else None
+
+    def put(self, channel, window_start, window_end, digest, analysis):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO partials (channel, window_start, window_end, digest, analysis, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (channel, window_start, window_end, digest, json.dumps(analysis, ensure_ascii=False), time.time()),
+            )
+
+    def prune(self, keep_days=INTRADAY_KEEP_DAYS):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM partials WHERE window_end < ?", (time.time() - keep_days * 86400,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_partial_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PartialStore()
+            _store.prune()
+    return _store
+
+
+def _window_texts(channel, start, end):
+    """메시지 저장소(load_messages로 미리 동기화)에서 구간의 사람 메시지 텍스트를 읽습니다."""
+    messages = get_store().get_messages(channel, start, latest=end)
+    return [m["text"] for m in messages if "text" in m and not m.get("bot_id")]
+
+
+def summarize_window(channel, start, end, store=None):
+    """
+    (start, end] 구간의 메시지를 분석해 저장하고 결과를 반환합니다. 메시지가 없으면 None.
+    구간 메시지가 저장 당시와 같으면 다시 분석하지 않습니다.
+    """
+    store = store or get_partial_store()
+    texts = _window_texts(channel, start, end)
+    if not texts:
+        return None
+    digest = texts_digest(texts)
+    saved = store.get(channel, start)
+    if saved and saved[0] == digest:
+        return saved[1]
+    label = window_label(start, end)
+    print(f"🕐 {label} 구간 메시지 {len(texts)}개 분석 (채널 {channel})")
+    result = analyze_conversation(texts, scope=f" 중 {label} 구간")
+    store.put(channel, start, end, digest, result)
+    return result
+
+
+def summarize_completed_windows(channel, now=None, max_workers=None, store=None):
+    """
+    오늘 끝난 구간 중 아직 분석하지 않았거나 메시지가 바뀐 구간만 분석합니다.
+    구간별로 따로 저장하므로 한 구간이 실패해도 나머지 결과는 남고, 다음 실행에서 그 구간만 다시 처리합니다.
+    [(start, end, 분석 결과 또는 None)] 과 실패한 구간 목록을 반환합니다.
+    """
+    now = time.time() if now is None else now
+    windows = completed_windows(today_start_ts(), now)
+
+    def run(window):
+        try:
+            return window, summarize_window(channel, *window, store=store), None
+        except Exception as e:
+            print(f"❌ {window_label(*window)} 구간 분석 실패: {e}")
+            return window, None, e
+
+    with ThreadPoolExecutor(max_workers=max_workers or SUMMARY_MAX_WORKERS) as pool:
+        outcomes = list(pool.map(run, windows))
+    results = [(start, end, result) for (start, end), result, error in outcomes if error is None]
+    failed = [window for window, _, error in outcomes if error is not None]
+    return results, failed
+
+
+def merge_day(channel, now=None, store=None):
+    """
+    하루 분석 = 끝난 구간들의 부분 분석 + 마지막 구간(아직 끝나지 않은 구간)의 분석을 merge_analyses로 합친 것.
+    저장된 구간은 다시 분석하지 않으므로 마감 시점의 비용은 대화량과 거의 무관합니다.
+    """
+    now = time.time() if now is None else now
+    results, failed = summarize_completed_windows(channel, now=now, store=store)
+    if failed:
+        labels = ", ".join(window_label(*window) for window in failed)
+        raise RuntimeError(f"구간 분석 실패: {labels} (다시 실행하면 실패한 구간만 처리합니다)")
+    last_end = results[-1][1] if results else today_start_ts()
+    partials = [result for _, _, result in results if result]
+    final_texts = _window_texts(channel, last_end, now)
+    if final_texts:
+        print(f"🕐 마지막 구간 {window_label(last_end, now)} 메시지 {len(final_texts)}개 분석")
+        partials.append(analyze_conversation(final_texts, scope=f" 중 {window_label(last_end, now)} 구간"))
+    print(f"🧩 구간 분석 {len(partials)}개를 합칩니다.")
+    return merge_analyses(partials)
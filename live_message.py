@@ -0,0 +1,81 @@
+import threading
+import time
+
+LIVE_UPDATE_INTERVAL = 1.0  # chat_update 사이 최소 간격(초). chat.update는 Tier 3(분당 약 50회)
+
+
+class LiveMessage:
+    """
+    먼저 게시해 두고 내용을 계속 고쳐 쓰는 Slack 메시지.
+    update()는 마지막 내용만 기억해 두었다가 min_interval에 한 번만 chat_update를 보냅니다(coalescing).
+    finish()는 남은 내용을 즉시 반영하고, delete()는 메시지를 지웁니다.
+    """
+
+    def __init__(self, client, channel, text, thread_ts=None, min_interval=LIVE_UPDATE_INTERVAL):
+        self.client = client
+        self.channel = channel
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.timer = None
+        self.pending = None
+        self.closed = False
+        kwargs = {"channel": channel, "text": text}
+        if thread_ts:
+            kwargs["thread_ts"] = thread_ts
+        response = client.chat_postMessage(**kwargs)
+        self.ts = response["ts"]
+        self.channel = response.get("channel", channel)
+        self.sent_text = text
+        self.sent_at = 0.0  # 첫 update는 바로 반영
+
+    def _send(self):
+        """lock을 잡은 상태에서 호출: 대기 중인 내용을 chat_update로 보냅니다."""
+        text, self.pending = self.pending, None
+        if text is None or text == self.sent_text:
+            return
+        try:
+            self.client.chat_update(channel=self.channel, ts=self.ts, text=text)
+            self.sent_text = text
+        except Exception as e:
+            print(f"메시지 업데이트 실패: {e}", flush=True)
+        self.sent_at = time.monotonic()
+
+    def _flush_later(self):
+        with self.lock:
+            self.timer = None
+            if not self.closed:
+                self._send()
+
+    def update(self, text):
+        with self.lock:
+            if self.closed:
+                return
+            self.pending = text
+            wait = self.min_interval - (time.monotonic() - self.sent_at)
+            if wait <= 0 and self.timer is None:
+                self._send()
+            elif self.timer is None:
+                self.timer = threading.Timer(max(wait, 0), self._flush_later)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def _close(self):
+        self.closed = True
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def finish(self, text=None):
+        with self.lock:
+            self._close()
+            if text is not None:
+                self.pending = text
+            self._send()
+
+    def delete(self):
+        with self.lock:
+            self._close()
+            try:
+                self.client.chat_delete(channel=self.channel, ts=self.ts)
+            except Exception as e:
+                print(f"메시지 삭제 실패: {e}", flush=True)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "0").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_cache.db"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 86400)))  # 초
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+
+
+def cache_key(model, messages, params):
+    payload = json.dumps({"model": model, "messages": messages, "params": params},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    (모델, 파라미터, 프롬프트) 해시 -> 응답 JSON 을 SQLite에 저장하는 캐시.
+    ttl이 지난 항목은 읽지 않고, max_entries를 넘으면 가장 오래 쓰이지 않은 항목부터 지웁니다.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                )
+                """
+            )
+            self.conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - ttl,))
+
+    def get(self, key):
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at >= ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY used_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def stats(self):
+        return f"LLM 캐시: hit {self.hits}, miss {self.misses}"
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """LLM_CACHE=1 일 때만 공유 캐시를 반환하고, 아니면 None."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+    return _cache
@@ -0,0 +1,86 @@
+# 엔트리포인트별 import 시간과 메모리 측정
+#
+# 사용 예:
+#   python measure_startup.py                  # 모든 봇
+#   python measure_startup.py cheer_bot --top 15
+#   python measure_startup.py --json > startup.json
+#
+# 모듈마다 새 파이썬 프로세스에서 `python -X importtime`으로 import만 하고
+# 걸린 시간, 최대 RSS, 누적 import 시간이 큰 모듈을 출력합니다. (Slack/OpenAI 호출은 하지 않음)
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ENTRY_POINTS = ["summary_bot", "productivity_bot", "cheer_bot", "daemon"]
+# import 시점에 필요한 환경변수 (실제 값이 있으면 그대로 사용)
+DUMMY_ENV = {"SLACK_BOT_TOKEN": "xoxb-dummy", "SLACK_APP_TOKEN": "xapp-dummy", "OPENAI_API_KEY": "sk-dummy"}
+# 패키지 내부 모듈까지 따로 세지 않도록 최상위 패키지로 묶어서 봄
+WATCHED = ["slack_sdk", "openai", "numpy", "notion_client", "flask", "tiktoken", "httpx", "pydantic"]
+
+CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "max_rss_mb": rss_kb / 1024,
+                  "loaded": sorted(m for m in {watched!r} if m in sys.modules)}}))
+"""
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력에서 {모듈: 누적 마이크로초}"""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        if cum.strip().isdigit():
+            cumulative[name.strip()] = int(cum)
+    return cumulative
+
+
+def measure(module):
+    env = dict(DUMMY_ENV, **os.environ)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD.format(module=module, watched=WATCHED)],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    stdout_lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not stdout_lines:
+        return {"module": module, "error": proc.stderr.strip().splitlines()[-1:]}
+    result = json.loads(stdout_lines[-1])
+    result["module"] = module
+    result["importtime"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--top", type=int, default=8, help="누적 시간이 큰 모듈 몇 개를 보여줄지")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    results = [measure(module) for module in args.modules]
+    if args.json:
+        for r in results:
+            r["importtime"] = dict(sorted(r.get("importtime", {}).items(), key=lambda kv: -kv[1])[:args.top])
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    for r in results:
+        if "error" in r:
+            print(f"❌ {r['module']}: import 실패 {r['error']}")
+            continue
+        print(f"\n⏱️ {r['module']}: {r['seconds'] * 1000:.0f}ms, 최대 RSS {r['max_rss_mb']:.0f}MB")
+        print(f"   로드된 무거운 패키지: {', '.join(r['loaded']) or '(없음)'}")
+        top = sorted(((n, us) for n, us in r["importtime"].items() if n != r["module"]), key=lambda kv: -kv[1])
+        for name, us in top[:args.top]:
+            print(f"   {us / 1000:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+MESSAGE_DB_PATH = os.getenv("MESSAGE_DB_PATH", os.path.join(CACHE_DIR, "messages.db"))
+HISTORY_PAGE_SIZE = 1000
+MESSAGE_KEEP_DAYS = int(os.getenv("MESSAGE_KEEP_DAYS", "14"))  # 이보다 오래된 메시지/스레드는 시작할 때 정리
+
+
+def today_start_ts():
+    """오늘 자정(Asia/Seoul)의 타임스탬프"""
+    now = datetime.now(ZoneInfo("Asia/Seoul"))
+    return now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+class MessageStore:
+    """
+    채널 메시지를 로컬 SQLite에 쌓아 두는 저장소.
+    채널마다 저장된 구간(oldest_ts ~ latest_ts)을 기록해 두고,
+    sync()는 latest_ts 이후의 새 메시지만 Slack에서 가져옵니다.
+    sync(refresh=True)는 oldest부터 한 번에 다시 받아 덮어써서, 저장 뒤에 달린 답글의
+    reply_count/latest_reply까지 반영합니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or MESSAGE_DB_PATH
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    channel TEXT NOT NULL,
+                    ts TEXT NOT NULL,
+                    raw TEXT NOT NULL,
+                    PRIMARY KEY (channel, ts)
+                );
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    channel TEXT PRIMARY KEY,
+                    oldest_ts REAL NOT NULL,
+                    latest_ts TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS threads (
+                    channel TEXT NOT NULL,
+                    thread_ts TEXT NOT NULL,
+                    latest_reply TEXT,
+                    replies TEXT NOT NULL,
+                    PRIMARY KEY (channel, thread_ts)
+                );
+                """
+            )
+
+    def checkpoint(self, channel):
+        """(oldest_ts, latest_ts) 또는 저장된 적이 없으면 None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT oldest_ts, latest_ts FROM checkpoints WHERE channel = ?", (channel,)
+            ).fetchone()
+        return (row["oldest_ts"], row["latest_ts"]) if row else None
+
+    def add_messages(self, channel, messages):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO messages (channel, ts, raw) VALUES (?, ?, ?)",
+                [(channel, m["ts"], json.dumps(m, ensure_ascii=False)) for m in messages],
+            )
+
+    def _set_checkpoint(self, channel, oldest_ts, latest_ts):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (channel, oldest_ts, latest_ts) VALUES (?, ?, ?)",
+                (channel, oldest_ts, latest_ts),
+            )
+
+    def _fetch_history(self, slack_client, channel, oldest):
+        """oldest 이후 메시지를 conversations_history로 next_cursor 끝까지 가져옵니다."""
+        fetched = []
+        cursor = None
+        while True:
+            kwargs = {"channel": channel, "oldest": f"{oldest:.6f}", "limit": HISTORY_PAGE_SIZE}
+            if cursor:
+                kwargs["cursor"] = cursor
+            response = slack_client.conversations_history(**kwargs)
+            fetched.extend(response["messages"])
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                return fetched
+
+    def sync(self, slack_client, channel, oldest, refresh=False):
+        """
+        oldest 이후 메시지 중 아직 저장되지 않은 것만 가져옵니다 (next_cursor 끝까지).
+        refresh면 oldest부터 전부 다시 받아 저장된 메시지도 갱신합니다 (스레드 답글 수 등).
+        새로 저장한 메시지 수를 반환합니다.
+        """
+        saved = self.checkpoint(channel)
+        if saved and saved[0] <= oldest <= float(saved[1]):
+            fetch_from, covered_from = (oldest if refresh else float(saved[1])), saved[0]
+        else:
+            # 처음이거나 저장된 구간보다 이전부터 요청하면 oldest부터 다시 가져옴
+            fetch_from, covered_from = oldest, oldest
+        fetched = self._fetch_history(slack_client, channel, fetch_from)
+        if fetched:
+            self.add_messages(channel, fetched)
+        latest = max([m["ts"] for m in fetched], key=float, default=None)
+        if saved and (latest is None or float(saved[1]) > float(latest)):
+            latest = saved[1]
+        self._set_checkpoint(channel, covered_from, latest or f"{fetch_from:.6f}")
+        if refresh and saved:
+            return sum(1 for m in fetched if float(m["ts"]) > float(saved[1]))
+        return len(fetched)
+
+    def get_messages(self, channel, oldest, latest=None):
+        """저장된 메시지를 오래된 순서로 반환합니다."""
+        # ts는 "초.마이크로초" 고정 폭 문자열이라 문자열 비교로 기본 키 인덱스를 씁니다
+        query = "SELECT raw FROM messages WHERE channel = ? AND ts > ?"
+        params = [channel, f"{oldest:.6f}"]
+        if latest is not None:
+            query += " AND ts <= ?"
+            params.append(f"{float(latest):.6f}")
+        query += " ORDER BY ts"
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [json.loads(row["raw"]) for row in rows]
+
+    def prune(self, keep_days=MESSAGE_KEEP_DAYS):
+        """keep_days보다 오래된 메시지와 스레드를 지우고, 저장 구간(oldest_ts)도 그만큼 줄입니다."""
+        cutoff = time.time() - keep_days * 86400
+        with self.lock, self.conn:
+            deleted = self.conn.execute("DELETE FROM messages WHERE ts < ?", (f"{cutoff:.6f}",)).rowcount
+            deleted += self.conn.execute("DELETE FROM threads WHERE thread_ts < ?", (f"{cutoff:.6f}",)).rowcount
+            self.conn.execute("DELETE FROM checkpoints WHERE CAST(latest_ts AS REAL) < ?", (cutoff,))
+            self.conn.execute("UPDATE checkpoints SET oldest_ts = ? WHERE oldest_ts < ?", (cutoff, cutoff))
+        if deleted:
+            # 지운 만큼 파일을 줄여야 actions/cache로 주고받는 크기도 줄어듦
+            with self.lock:
+                self.conn.execute("VACUUM")
+        return deleted
+
+    def get_thread(self, channel, thread_ts):
+        """저장된 스레드의 (latest_reply, 답글 목록) 또는 None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT latest_reply, replies FROM threads WHERE channel = ? AND thread_ts = ?", (channel, thread_ts)
+            ).fetchone()
+        return (row["latest_reply"], json.loads(row["replies"])) if row else None
+
+    def save_thread(self, channel, thread_ts, latest_reply, replies):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO threads (channel, thread_ts, latest_reply, replies) VALUES (?, ?, ?, ?)",
+                (channel, thread_ts, latest_reply, json.dumps(replies, ensure_ascii=False)),
+            )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MessageStore()
+            _store.prune()
+    return _store
+
+
+def load_messages(slack_client, channel, oldest=None, refresh=False):
+    """
+    저장소를 Slack과 동기화한 뒤 oldest 이후 메시지를 반환합니다.
+    refresh면 oldest 이후를 다시 받아 저장된 부모 메시지의 reply_count/latest_reply도 최신으로 만듭니다.
+    Slack API 오류가 나면 이미 저장된 메시지만 반환합니다.
+    """
+    from slack_sdk.errors import SlackApiError
+    oldest = today_start_ts() if oldest is None else oldest
+    store = get_store()
+    try:
+        added = store.sync(slack_client, channel, oldest, refresh=refresh)
+        print(f"📥 새 메시지 {added}개 저장 (채널 {channel})")
+    except SlackApiError as e:
+        print(f"Slack API 오류: {e}")
+    return store.get_messages(channel, oldest)
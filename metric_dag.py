@@ -0,0 +1,78 @@
+import queue
+import threading
+import time
+
+
+class Metric:
+    """
+    DAG의 노드 하나. fn은 deps에 적힌 메트릭 결과를 같은 이름의 키워드 인자로 받습니다.
+    timeout(초)이 지나면 결과를 기다리지 않고 실패로 처리합니다.
+    """
+
+    def __init__(self, name, fn, deps=(), timeout=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+
+
+def _run_metric(metric, kwargs, outcomes):
+    try:
+        outcomes.put((metric.name, metric.fn(**kwargs), None))
+    except Exception as e:
+        outcomes.put((metric.name, None, e))
+
+
+def run_metrics(metrics, max_workers=4):
+    """
+    의존성이 모두 끝난 메트릭부터 최대 max_workers개씩 동시에 실행합니다.
+    (결과 dict, 실패 사유 dict, 소요 시간 dict)을 반환하며, 한 메트릭이 실패해도 나머지는 계속 진행합니다.
+    의존하는 메트릭이 실패하면 그 메트릭도 실행하지 않고 실패로 기록합니다.
+
+    메트릭은 데몬 스레드에서 돌리므로 시간 초과된 메트릭이 있어도 이 함수와 프로세스 종료를 막지 않습니다.
+    다만 파이썬 스레드는 밖에서 멈출 수 없어, 상주 프로세스(daemon.py)에서는 시간 초과된 메트릭이
+    자기 API 호출이 끝날 때까지 뒤에서 계속 돕니다 (동시 실행 수에는 더 이상 세지 않음).
+    """
+    pending = {m.name: m for m in metrics}
+    results, errors, timings = {}, {}, {}
+    running = {}  # 메트릭 이름 -> (메트릭, 시작 시각)
+    outcomes = queue.Queue()
+    while pending or running:
+        for name, metric in list(pending.items()):
+            failed = [d for d in metric.deps if d in errors]
+            if failed:
+                errors[name] = f"의존 메트릭 실패: {', '.join(failed)}"
+                del pending[name]
+            elif all(d in results for d in metric.deps) and len(running) < max_workers:
+                kwargs = {d: results[d] for d in metric.deps}
+                threading.Thread(target=_run_metric, args=(metric, kwargs, outcomes),
+                                 name=f"metric-{name}", daemon=True).start()
+                running[name] = (metric, time.monotonic())
+                del pending[name]
+        if not running:
+            if pending:
+                # 존재하지 않는 메트릭에 의존하는 경우
+                for name in pending:
+                    errors[name] = "의존 메트릭을 찾을 수 없음"
+            break
+        now = time.monotonic()
+        deadlines = [start + m.timeout - now for m, start in running.values() if m.timeout]
+        try:
+            name, result, error = outcomes.get(timeout=max(0, min(deadlines)) if deadlines else None)
+        except queue.Empty:
+            name = None
+        now = time.monotonic()
+        if name in running:
+            metric, start = running.pop(name)
+            timings[name] = now - start
+            if error is None:
+                results[name] = result
+            else:
+                errors[name] = f"{type(error).__name__}: {error}"
+        for name, (metric, start) in list(running.items()):
+            if metric.timeout and now - start >= metric.timeout:
+                # 실행 중인 스레드는 멈출 수 없으므로 결과를 기다리지 않음 (늦게 온 결과는 버림)
+                del running[name]
+                timings[name] = now - start
+                errors[name] = f"시간 초과 ({metric.timeout}초)"
+    return results, errors, timings
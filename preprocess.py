@@ -0,0 +1,186 @@
+import html
+import os
+import re
+import zlib
+from collections import defaultdict
+
+from utils import estimate_tokens
+
+# 프롬프트를 만들기 전에 메시지 텍스트를 줄이는 전처리 (PREPROCESS=0 이면 원문 그대로 사용)
+PREPROCESS = os.getenv("PREPROCESS", "1").lower() not in ("0", "false", "no")
+
+URL_MAX_CHARS = 60  # 라벨 없는 링크는 scheme/쿼리를 떼고 이 길이까지만
+BLOCK_MAX_LINES = int(os.getenv("PREPROCESS_BLOCK_MAX_LINES", "20"))  # 코드/로그 블록이 이보다 길면 자름
+BLOCK_HEAD_LINES = 10
+BLOCK_TAIL_LINES = 5  # 에러는 보통 끝에 있으므로 뒷부분도 남김
+BLOCK_MAX_CHARS = 2000
+LINE_MAX_CHARS = 300
+
+# 근사 중복: 글자 5-gram 집합의 Jaccard 유사도를 MinHash(32개) + LSH(8밴드)로 후보만 비교
+DUP_THRESHOLD = float(os.getenv("PREPROCESS_DUP_THRESHOLD", "0.85"))
+DUP_MIN_CHARS = 30  # 짧은 메시지("넵", "확인했습니다")는 맥락이 달라 합치지 않음
+SHINGLE_SIZE = 5
+MINHASH_PERMUTATIONS = 32
+MINHASH_BANDS = 8
+MINHASH_SEED = 1  # 실행마다 같은 결과가 나와야 분석 캐시가 재사용됨
+_PRIME = (1 << 31) - 1
+
+FENCE_RE = re.compile(r"```(.*?)(?:```|$)", re.DOTALL)
+MENTION_RE = re.compile(r"<@([UW][A-Z0-9]+)(?:\|([^>]+))?>")
+CHANNEL_RE = re.compile(r"<#(C[A-Z0-9]+)(?:\|([^>]*))?>")
+SPECIAL_RE = re.compile(r"<!([^>|]+)(?:\|([^>]+))?>")
+LINK_RE = re.compile(r"<((?:https?|mailto):[^>|]+)(?:\|([^>]+))?>")
+EMOJI_RE = re.compile(r"(?<![A-Za-z0-9]):(?:[+-]1|(?=[a-z0-9_+'-]*[a-z])[a-z0-9_+'-]+):(?::skin-tone-\d:)?(?![A-Za-z0-9])")
+# 로그/트레이스백으로 보이는 줄: 시각, 로그 레벨, 스택 프레임
+LOG_LINE_RE = re.compile(
+    r"^\s*(\d{4}-\d{2}-\d{2}|\d{2}:\d{2}:\d{2}|\[?(DEBUG|INFO|WARN|WARNING|ERROR|TRACE|FATAL)\b|"
+    r"at [\w$.]+\(|File \"|Traceback|\w+(Error|Exception)\b)")
+# 빌드 번호, PR 번호, request id처럼 메시지마다 바뀌는 값: 중복 비교 전에 같은 글자로 바꿈
+# (1~2자리 숫자는 "3시"/"5시"처럼 내용이 달라지는 경우가 많아 그대로 둠)
+ID_RE = re.compile(r"(?<![0-9A-Za-z])(?=[0-9A-Za-z_-]*\d)[0-9A-Za-z_-]{8,}|\d{3,}")
+# 글자/숫자가 하나도 없거나 웃음/울음 자모만 있는 메시지는 내용이 없다고 봄
+NO_CONTENT_RE = re.compile(r"[ㅋㅎㅠㅜ]+|@\S+|[\W_]+")
+
+
+def _short_url(url):
+    url = re.sub(r"^(https?://)?(www\.)?", "", url)
+    url = re.split(r"[?#]", url, maxsplit=1)[0].rstrip("/")
+    return url if len(url) <= URL_MAX_CHARS else url[:URL_MAX_CHARS] + "…"
+
+
+def normalize_markup(text):
+    """Slack 마크업을 평문으로: 멘션/채널/링크는 이름·짧은 주소로, :emoji: 코드는 제거."""
+    text = MENTION_RE.sub(lambda m: "@" + (m.group(2) or m.group(1)), text)
+    text = CHANNEL_RE.sub(lambda m: "#" + (m.group(2) or m.group(1)), text)
+    text = LINK_RE.sub(lambda m: m.group(2) or _short_url(m.group(1)), text)
+    text = SPECIAL_RE.sub(lambda m: m.group(2) or "@" + m.group(1).split("^")[0], text)
+    text = EMOJI_RE.sub("", text)
+    text = html.unescape(text)
+    text = re.sub(r"[ \t]+", " ", text)
+    return re.sub(r"\n\s*\n+", "\n\n", text).strip()
+
+
+def truncate_lines(lines):
+    """긴 블록은 앞 BLOCK_HEAD_LINES줄과 뒤 BLOCK_TAIL_LINES줄만 남기고, 줄/블록 길이도 제한합니다."""
+    lines = [line if len(line) <= LINE_MAX_CHARS else line[:LINE_MAX_CHARS] + "…" for line in lines]
+    if len(lines) > BLOCK_MAX_LINES:
+        skipped = len(lines) - BLOCK_HEAD_LINES - BLOCK_TAIL_LINES
+        lines = lines[:BLOCK_HEAD_LINES] + [f"… ({skipped}줄 생략)"] + lines[-BLOCK_TAIL_LINES:]
+    block = "\n".join(lines)
+    if len(block) > BLOCK_MAX_CHARS:
+        block = block[:BLOCK_MAX_CHARS] + f"… ({len(block) - BLOCK_MAX_CHARS}자 생략)"
+    return block
+
+
+def _truncate_log_runs(text):
+    """코드 블록 밖에 붙여 넣은 로그: 로그처럼 보이는 줄이 BLOCK_MAX_LINES줄 넘게 이어지면 자릅니다."""
+    lines = text.split("\n")
+    out, run = [], []
+    for line in lines + [None]:
+        if line is not None and LOG_LINE_RE.match(line):
+            run.append(line)
+            continue
+        if run:
+            out.append(truncate_lines(run) if len(run) > BLOCK_MAX_LINES else "\n".join(run))
+            run = []
+        if line is not None:
+            out.append(line)
+    return "\n".join(out)
+
+
+def clean_text(text):
+    """메시지 하나를 정리합니다: ``` 블록은 길이만 줄이고, 나머지는 마크업 정리 후 긴 로그를 자릅니다."""
+    parts, pos = [], 0
+    for match in FENCE_RE.finditer(text):
+        parts.append(_truncate_log_runs(normalize_markup(text[pos:match.start()])))
+        code = html.unescape(match.group(1)).strip("\n")
+        parts.append("```\n" + truncate_lines(code.split("\n")) + "\n```")
+        pos = match.end()
+    parts.append(_truncate_log_runs(normalize_markup(text[pos:])))
+    return "\n".join(p for p in parts if p).strip()
+
+
+def is_low_content(text):
+    """이모지만, 웃음(ㅋㅋ)만, 멘션만 있는 메시지처럼 글자/숫자가 남지 않는 경우."""
+    return not NO_CONTENT_RE.sub("", text)
+
+
+def _shingles(text):
+    text = " ".join(ID_RE.sub("0", text).lower().split())
+    return {zlib.crc32(text[i:i + SHINGLE_SIZE].encode("utf-8"))
+            for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+
+
+def find_near_duplicates(texts, threshold=None):
+    """
+    각 메시지가 앞선 어떤 메시지와 (번호/ID를 지운 5-gram Jaccard 기준으로) 거의 같은지 찾습니다.
+    반환값 rep[i]는 대표 메시지 번호(중복이 아니면 i 자신)입니다.
+    """
+    import numpy as np
+    threshold = DUP_THRESHOLD if threshold is None else threshold
+    rng = np.random.RandomState(MINHASH_SEED)
+    a = rng.randint(1, _PRIME, MINHASH_PERMUTATIONS).astype(np.uint64)
+    b = rng.randint(0, _PRIME, MINHASH_PERMUTATIONS).astype(np.uint64)
+    rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    rep = list(range(len(texts)))
+    buckets = defaultdict(list)
+    kept = {}
+    for i, text in enumerate(texts):
+        if len(text) < DUP_MIN_CHARS:
+            continue
+        shingles = _shingles(text)
+        hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        signature = ((np.outer(a, hashes) + b[:, None]) % _PRIME).min(axis=1)
+        keys = [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(MINHASH_BANDS)]
+        checked = set()
+        for key in keys:
+            for j in buckets.get(key, ()):
+                if j in checked:
+                    continue
+                checked.add(j)
+                if len(shingles & kept[j]) / len(shingles | kept[j]) >= threshold:
+                    rep[i] = j
+                    break
+            if rep[i] != i:
+                break
+        if rep[i] == i:
+            kept[i] = shingles
+            for key in keys:
+                buckets[key].append(i)
+    return rep
+
+
+def preprocess_texts(texts, label="프롬프트"):
+    """
+    프롬프트에 넣을 메시지 목록을 줄입니다: 마크업 정리, 긴 코드/로그 블록 자르기,
+    내용 없는 메시지 제거, 근사 중복은 첫 메시지에 "(비슷한 메시지 N건 더)"로 합침.
+    (정리된 텍스트 목록, 통계 dict)를 반환하고 전후 토큰 수를 출력합니다.
+    """
+    if not PREPROCESS:
+        return list(texts), {}
+    cleaned = [clean_text(t) for t in texts]
+    kept = [t for t in cleaned if not is_low_content(t)]
+    rep = find_near_duplicates(kept)
+    repeats = defaultdict(int)
+    for i, r in enumerate(rep):
+        if r != i:
+            repeats[r] += 1
+    result = [f"{t} (비슷한 메시지 {repeats[i]}건 더)" if repeats[i] else t
+              for i, t in enumerate(kept) if rep[i] == i]
+    stats = {
+        "messages_before": len(texts),
+        "messages_after": len(result),
+        "low_content": len(cleaned) - len(kept),
+        "duplicates": sum(repeats.values()),
+        "tokens_before": sum(estimate_tokens(t) for t in texts),
+        "tokens_after": sum(estimate_tokens(t) for t in result),
+    }
+    report_preprocess(stats, label)
+    return result, stats
+
+
+def report_preprocess(stats, label):
+    before, after = stats["tokens_before"], stats["tokens_after"]
+    saved = f" (-{1 - after / before:.0%})" if before else ""
+    print(f"✂️ {label} 전처리: 메시지 {stats['messages_before']}→{stats['messages_after']}개 "
+          f"(내용 없음 {stats['low_content']}, 중복 {stats['duplicates']}), 토큰 {before:,}→{after:,}{saved}")
@@ -1,139 +1,210 @@
 import os
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from utils import send_slack_message, slack_client, CHANNEL_ID
-import openai
-from slack_sdk.errors import SlackApiError
+from utils import send_slack_message, get_slack_client, get_notion_client, chat_completion, estimate_tokens, report_llm_cache, CHANNEL_ID
 from collections import defaultdict
-import notion_client
-from openai import OpenAI
-from tqdm import tqdm
-import numpy as np
-
-openai.api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# 오늘 메시지 수집
-def get_today_messages():
-    now = datetime.now(ZoneInfo("Asia/Seoul"))
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+from concurrent.futures import ThreadPoolExecutor
+import json
+from message_store import load_messages
+from user_directory import get_user_directory
+from metric_dag import Metric, run_metrics
+from completion_index import CompletionIndex
+from thread_harvester import harvest_threads, percentile
+from channels import resolve_channels, run_for_channels
+from analysis import get_daily_analysis, format_action_items, format_counts
+from preprocess import PREPROCESS, clean_text, is_low_content, find_near_duplicates, report_preprocess
+
+# 정보 밀도 분류: 한 번의 요청에 담을 메시지 수, 동시에 보낼 요청 수
+DENSITY_BATCH_SIZE = int(os.getenv("DENSITY_BATCH_SIZE", "40"))
+DENSITY_MAX_WORKERS = int(os.getenv("DENSITY_MAX_WORKERS", "4"))
+DENSITY_MAX_CHARS = 1000  # 배치 프롬프트에 넣을 메시지당 최대 글자 수
+
+# 메트릭 동시 실행 수와 메트릭별 제한 시간(초)
+METRIC_MAX_WORKERS = int(os.getenv("METRIC_MAX_WORKERS", "4"))
+METRIC_TIMEOUT = float(os.getenv("METRIC_TIMEOUT", "600"))
+
+# 오늘 메시지 수집 (스레드 답글 수가 최신이도록 오늘 구간을 한 번 다시 받아 저장소 갱신)
+def get_today_messages(channel=None):
+    messages = load_messages(get_slack_client(), channel or CHANNEL_ID, refresh=True)
+    return [msg for msg in messages if "text" in msg and not msg.get("bot_id")]
+
+# 정보 밀도 평가 (메시지 1개 단위, 배치 응답이 깨졌을 때의 폴백)
+def classify_message(text):
+    prompt = f"이 Slack 메시지는 정보 전달(논의/결정/지식공유)인가요, 아니면 잡담인가요?\n메시지: {text}\n답: informative 또는 chatter로만 답하세요."
+    resp = chat_completion(
+        [{"role": "user", "content": prompt}],
+        max_tokens=10, temperature=0
+    )
+    answer = resp.choices[0].message.content.strip().lower()
+    return "informative" in answer
+
+def _parse_batch_labels(content, size):
+    """배치 응답(JSON)에서 {번호: informative 여부}를 뽑습니다. 형식이 틀린 항목은 건너뜁니다."""
     try:
-        response = slack_client.conversations_history(
-            channel=CHANNEL_ID,
-            oldest=today_start,
-            limit=1000
-        )
-        messages = response["messages"]
-        return [msg for msg in messages if "text" in msg and not msg.get("bot_id")]
-    except SlackApiError as e:
-        print(f"Slack API 오류: {e}")
-        return []
-
-# 정보 밀도 평가
-def information_density(messages):
-    informative = 0
-    for msg in messages:
-        prompt = f"이 Slack 메시지는 정보 전달(논의/결정/지식공유)인가요, 아니면 잡담인가요?\n메시지: {msg['text']}\n답: informative 또는 chatter로만 답하세요."
-        resp = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=10, temperature=0
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return {}
+    labels = data.get("labels") if isinstance(data, dict) else None
+    if not isinstance(labels, list):
+        return {}
+    result = {}
+    for entry in labels:
+        if not isinstance(entry, dict):
+            continue
+        idx, label = entry.get("id"), str(entry.get("label", "")).strip().lower()
+        if isinstance(idx, int) and 0 <= idx < size and label in ("informative", "chatter"):
+            result[idx] = label == "informative"
+    return result
+
+def classify_batch(texts):
+    """
+    여러 메시지를 한 번의 요청으로 분류합니다.
+    응답에서 빠지거나 잘못된 항목은 반으로 나눠 다시 요청하고, 1개가 남으면 단건 분류로 처리합니다.
+    """
+    if len(texts) == 1:
+        return [classify_message(texts[0])]
+    payload = [{"id": i, "text": t[:DENSITY_MAX_CHARS]} for i, t in enumerate(texts)]
+    prompt = (
+        "다음 Slack 메시지들 각각이 정보 전달(논의/결정/지식공유)인지, 잡담인지 분류하세요.\n"
+        "반드시 아래 JSON 형식으로만 답하세요. 모든 id에 대해 하나씩 답해야 합니다.\n"
+        '{"labels": [{"id": 0, "label": "informative"}, {"id": 1, "label": "chatter"}]}\n\n'
+        f"메시지 목록(JSON):\n{json.dumps(payload, ensure_ascii=False)}"
+    )
+    try:
+        resp = chat_completion(
+            [{"role": "user", "content": prompt}],
+            max_tokens=20 * len(texts) + 50, temperature=0,
+            response_format={"type": "json_object"}
         )
-        answer = resp.choices[0].message.content.strip().lower()
-        if "informative" in answer:
-            informative += 1
-    return informative / len(messages) if messages else 0
+        labels = _parse_batch_labels(resp.choices[0].message.content, len(texts))
+    except Exception as e:
+        print(f"배치 분류 실패, 나눠서 재시도합니다: {e}")
+        labels = {}
+    missing = [i for i in range(len(texts)) if i not in labels]
+    if missing:
+        if len(missing) == len(texts):
+            mid = len(texts) // 2
+            return classify_batch(texts[:mid]) + classify_batch(texts[mid:])
+        retried = classify_batch([texts[i] for i in missing])
+        labels.update(zip(missing, retried))
+    return [labels[i] for i in range(len(texts))]
 
-# Action Item 추출
+def information_density(messages, batch_size=None, max_workers=None):
+    if not messages:
+        return 0
+    batch_size = batch_size or DENSITY_BATCH_SIZE
+    max_workers = max_workers or DENSITY_MAX_WORKERS
+    texts = [m['text'] for m in messages]
+    if PREPROCESS:
+        # 내용 없는 메시지는 묻지 않고 잡담으로, 근사 중복은 대표 메시지 하나만 분류해 결과를 나눠 씀
+        cleaned = [clean_text(t) for t in texts]
+        rep = find_near_duplicates(cleaned)
+        unique = [i for i, t in enumerate(cleaned) if rep[i] == i and not is_low_content(t)]
+        report_preprocess({
+            "messages_before": len(texts), "messages_after": len(unique),
+            "low_content": sum(1 for i, t in enumerate(cleaned) if rep[i] == i and is_low_content(t)),
+            "duplicates": sum(1 for i, r in enumerate(rep) if r != i),
+            "tokens_before": sum(estimate_tokens(t[:DENSITY_MAX_CHARS]) for t in texts),
+            "tokens_after": sum(estimate_tokens(cleaned[i][:DENSITY_MAX_CHARS]) for i in unique),
+        }, "정보 밀도")
+    else:
+        cleaned, rep, unique = texts, list(range(len(texts))), list(range(len(texts)))
+    to_classify = [cleaned[i] for i in unique]
+    batches = [to_classify[i:i + batch_size] for i in range(0, len(to_classify), batch_size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(classify_batch, batches))
+    labels = dict(zip(unique, (label for batch in results for label in batch)))
+    informative = sum(1 for i in range(len(texts)) if labels.get(rep[i], False))
+    return informative / len(messages)
+
+# Action Item 추출 (summary_bot과 공유하는 일일 분석 결과 사용)
 def extract_action_items(messages):
-    prompt = "아래는 오늘 Slack 대화입니다. Action Item(할 일, 요청, 결정 등)을 항목별로 추출해줘.\n" + "\n".join([m['text'] for m in messages])
-    resp = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=300, temperature=0.3
-    )
-    items = [line for line in resp.choices[0].message.content.splitlines() if line.strip().startswith("-")]
-    return items
+    return format_action_items(get_daily_analysis([m['text'] for m in messages]), with_owner=False)
 
-# 응답 속도(분)
-def avg_response_time(messages):
+# 응답 속도(분): 스레드 답글 전체(conversations_replies)를 모아 평균/p50/p90 계산
+def response_time_stats(messages, threads=None, channel=None):
     ts_map = {m['ts']: m for m in messages}
-    total, count = 0, 0
+    if threads is None:
+        threads = harvest_threads(get_slack_client(), channel or CHANNEL_ID, messages)
+    replies = {}
+    for thread_ts, thread_replies in threads.items():
+        for reply in thread_replies:
+            replies[reply['ts']] = reply
+    # 채널에도 함께 게시된 답글은 conversations_history에도 있음
     for m in messages:
-        thread_ts = m.get('thread_ts')
-        if thread_ts and thread_ts != m['ts'] and thread_ts in ts_map:
-            parent = ts_map[thread_ts]
-            diff = float(m['ts']) - float(parent['ts'])
-            total += diff / 60
-            count += 1
-    return total / count if count else 0
+        if m.get('thread_ts') and m['thread_ts'] != m['ts']:
+            replies.setdefault(m['ts'], m)
+    diffs = []
+    for reply in replies.values():
+        parent = ts_map.get(reply.get('thread_ts'))
+        if parent and not reply.get('bot_id'):
+            diffs.append((float(reply['ts']) - float(parent['ts'])) / 60)
+    diffs.sort()
+    return {
+        "mean": sum(diffs) / len(diffs) if diffs else 0,
+        "p50": percentile(diffs, 50),
+        "p90": percentile(diffs, 90),
+        "count": len(diffs),
+    }
+
+def format_response_times(stats):
+    return f"{stats['mean']:.1f}분 (p50 {stats['p50']:.1f}분, p90 {stats['p90']:.1f}분, 답글 {stats['count']}개)"
+
+def avg_response_time(messages):
+    return response_time_stats(messages)["mean"]
 
 # 요약 길이(단어 수)
 def summary_length(messages):
-    prompt = "아래는 오늘 Slack 대화입니다. 요약해줘.\n" + "\n".join([m['text'] for m in messages])
-    resp = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=500, temperature=0.5
-    )
-    summary = resp.choices[0].message.content
+    summary = get_daily_analysis([m['text'] for m in messages])["summary"]
     return len(summary.split())
 
-# 발화자 분포
+# 결정된 사항 / 답이 나오지 않은 질문 수 (요약과 같은 분석 결과에서)
+def discussion_counts(messages):
+    return format_counts(get_daily_analysis([m['text'] for m in messages])) or "(집계 없음)"
+
+# 발화자 분포 (user ID 기준으로 세고, 이름은 보고서에 쓸 때 붙임)
 def speaker_distribution(messages):
     dist = defaultdict(int)
     for m in messages:
-        user = m.get('user', 'unknown')
-        dist[user] += 1
+        dist[m.get('user') or 'unknown'] += 1
     return dict(dist)
 
+def format_speaker_distribution(dist):
+    """{user ID: 수}를 사용자 캐시의 표시 이름으로 바꿉니다. 이름이 같은 사람은 ID를 덧붙여 구분."""
+    directory = get_user_directory(get_slack_client())
+    directory.warm()
+    names = {user: directory.display_name(user, default=user) if user != 'unknown' else user for user in dist}
+    directory.save()
+    taken = defaultdict(int)
+    for name in names.values():
+        taken[name] += 1
+    return str({(f"{names[user]} ({user})" if taken[names[user]] > 1 else names[user]): count
+                for user, count in dist.items()})
+
 # 대화 중복도 측정 (임베딩 기반)
 def message_redundancy(messages, threshold=0.85):
     if len(messages) < 2:
         return 0.0
+    # numpy는 이 메트릭에서만 쓰므로 여기서 import
+    from similarity import embed_texts, redundancy_ratio, EMBEDDING_MODEL
+    from embedding_cache import get_embedding_cache
     texts = [m['text'] for m in messages]
-    embeds = client.embeddings.create(
-        input=texts,
-        model="text-embedding-ada-002"
-    ).data
-    vectors = np.array([e.embedding for e in embeds])
-    # 코사인 유사도 행렬 계산
-    norm = np.linalg.norm(vectors, axis=1, keepdims=True)
-    normed = vectors / (norm + 1e-8)
-    sim_matrix = np.dot(normed, normed.T)
-    # 상삼각행렬에서 자기 자신 제외, threshold 이상 비율 계산
-    n = len(texts)
-    redundant = 0
-    total = 0
-    for i in range(n):
-        for j in range(i+1, n):
-            total += 1
-            if sim_matrix[i, j] >= threshold:
-                redundant += 1
-    return redundant / total if total else 0.0
-
-# 할 일 이행 비율 측정
+    cache = get_embedding_cache(EMBEDDING_MODEL)
+    vectors = embed_texts(texts, cache=cache)
+    print(f"임베딩 캐시 (누적): hit {cache.hits}, miss {cache.misses}")
+    # 상삼각 영역을 타일 단위로 계산해 threshold 이상 비율 계산
+    return redundancy_ratio(vectors, threshold)
+
+# 할 일 이행 비율 측정 (완료 표시가 있는 메시지의 역색인으로 키워드 매칭)
 def action_item_completion_ratio(messages, action_items):
     if not action_items:
         return 0.0
-    completed = 0
-    texts = [m['text'] for m in messages]
-    for item in action_items:
-        # Action Item에서 핵심 키워드 추출 (단순화: 첫 5글자)
-        keyword = item.replace('-', '').strip().split()[0]
-        found = False
-        for text in texts:
-            if keyword in text and any(x in text for x in ["완료", "했어요", "PR", "merge", "끝", "처리"]):
-                found = True
-                break
-        if found:
-            completed += 1
-    return completed / len(action_items)
+    index = CompletionIndex([m['text'] for m in messages])
+    return index.completion_ratio(action_items)
 
 def append_report_to_notion(report: str):
-    NOTION_TOKEN = os.getenv("NOTION_TOKEN")
     PAGE_ID = os.getenv("NOTION_PAGE_ID")
-    notion = notion_client.Client(auth=NOTION_TOKEN)
+    notion = get_notion_client()
     now = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M")
     try:
         notion.blocks.children.append(
@@ -157,30 +228,64 @@ def append_report_to_notion(report: str):
     except Exception as e:
         print("❌ Notion 페이지에 보고서 추가 실패!", e)
 
-# 메트릭 종합 및 전송
-def main():
-    
-    messages = get_today_messages()
+def build_metrics(messages, channel=None):
+    """메트릭 DAG. action_item_completion_ratio만 extract_action_items 결과에 의존합니다."""
+    return [
+        Metric("info_density", lambda: information_density(messages), timeout=METRIC_TIMEOUT),
+        Metric("action_items", lambda: extract_action_items(messages), timeout=METRIC_TIMEOUT),
+        Metric("avg_resp", lambda: response_time_stats(messages, channel=channel), timeout=METRIC_TIMEOUT),
+        Metric("sum_len", lambda: summary_length(messages), timeout=METRIC_TIMEOUT),
+        Metric("counts", lambda: discussion_counts(messages), timeout=METRIC_TIMEOUT),
+        Metric("speaker_dist", lambda: speaker_distribution(messages), timeout=METRIC_TIMEOUT),
+        Metric("redundancy", lambda: message_redundancy(messages), timeout=METRIC_TIMEOUT),
+        Metric("completion_ratio", lambda action_items: action_item_completion_ratio(messages, action_items),
+               deps=["action_items"], timeout=METRIC_TIMEOUT),
+    ]
+
+# 채널 하나의 메트릭 종합 및 전송. 오늘 메시지가 없으면 False
+def run_productivity(channel=None, notify_empty=True):
+    channel = channel or CHANNEL_ID
+    messages = get_today_messages(channel)
     if not messages:
-        send_slack_message("오늘 대화가 없습니다. (생산성 평가 불가)")
-        return
-    info_density = information_density(messages)
-    action_items = extract_action_items(messages)
-    avg_resp = avg_response_time(messages)
-    sum_len = summary_length(messages)
-    speaker_dist = speaker_distribution(messages)
-    redundancy = message_redundancy(messages)
-    completion_ratio = action_item_completion_ratio(messages, action_items)
-    report = f"[오늘의 생산성 메트릭]\n"
-    report += f"정보 밀도: {info_density:.2f}\n"
-    report += f"Action Item 수: {len(action_items)}\n"
-    report += f"평균 응답 속도: {avg_resp:.1f}분\n"
-    report += f"요약 길이: {sum_len} 단어\n"
-    report += f"발화자 분포: {speaker_dist}\n"
-    report += f"대화 중복도: {redundancy:.2%}\n"
-    report += f"Action Item 이행 비율: {completion_ratio:.2%}\n"
-    # send_slack_message(report)
+        if notify_empty:
+            send_slack_message("오늘 대화가 없습니다. (생산성 평가 불가)", channel=channel)
+        return False
+    results, errors, timings = run_metrics(build_metrics(messages, channel), max_workers=METRIC_MAX_WORKERS)
+    for name, seconds in sorted(timings.items(), key=lambda kv: -kv[1]):
+        print(f"⏱️ [{channel}] {name}: {seconds:.1f}초" + (f" (실패: {errors[name]})" if name in errors else ""))
+
+    def fmt(name, format_value):
+        if name in errors:
+            return f"실패 ({errors[name]})"
+        return format_value(results[name])
+
+    report = f"[오늘의 생산성 메트릭]\n" if channel == CHANNEL_ID else f"[오늘의 생산성 메트릭] 채널 {channel}\n"
+    report += f"정보 밀도: {fmt('info_density', lambda v: f'{v:.2f}')}\n"
+    report += f"Action Item 수: {fmt('action_items', len)}\n"
+    report += f"평균 응답 속도: {fmt('avg_resp', format_response_times)}\n"
+    report += f"요약 길이: {fmt('sum_len', lambda v: f'{v} 단어')}\n"
+    report += f"결정/질문: {fmt('counts', str)}\n"
+    report += f"발화자 분포: {fmt('speaker_dist', format_speaker_distribution)}\n"
+    report += f"대화 중복도: {fmt('redundancy', lambda v: f'{v:.2%}')}\n"
+    report += f"Action Item 이행 비율: {fmt('completion_ratio', lambda v: f'{v:.2%}')}\n"
+    # send_slack_message(report, channel=channel)
     append_report_to_notion(report)
+    return True
+
+# 메트릭 종합 및 전송 (--channels / --all-channels / CHANNEL_IDS 로 여러 채널 동시 처리)
+def main():
+    channels = resolve_channels()
+    if len(channels) > 1:
+        # 채널 스레드마다 users_list를 받지 않도록 사용자 캐시는 먼저 한 번만 채움
+        get_user_directory(get_slack_client()).warm()
+        # 조용한 채널마다 "대화가 없습니다"를 올리지 않고 마지막에 모아서 출력
+        results = run_for_channels(lambda channel: run_productivity(channel, notify_empty=False), channels)
+        quiet = [channel for channel, result in results.items() if result is False]
+        if quiet:
+            print(f"💤 오늘 대화가 없는 채널 {len(quiet)}개: {', '.join(quiet)}")
+    else:
+        run_productivity(channels[0] if channels else None)
+    report_llm_cache()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,182 @@
+import os
+import random
+import sys
+import threading
+import time
+
+# Slack Web API 메서드별 분당 허용 호출 수 (https://api.slack.com/docs/rate-limits 의 Tier 기준)
+SLACK_TIER_PER_MINUTE = {1: 1, 2: 20, 3: 50, 4: 100}
+SLACK_METHOD_TIERS = {
+    "conversations_history": 3,
+    "conversations_replies": 3,
+    "conversations_list": 2,
+    "users_list": 2,
+    "users_info": 4,
+    "chat_update": 3,
+    "chat_delete": 3,
+    "reactions_add": 3,
+}
+SLACK_POST_PER_MINUTE = 60  # chat.postMessage는 채널당 초당 1건 정도
+SLACK_DEFAULT_TIER = 3
+
+# OpenAI 요청 수/토큰 수 한도 (조직 한도에 맞게 환경변수로 조정)
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "3500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "160000"))
+OPENAI_EMBEDDING_TPM = int(os.getenv("OPENAI_EMBEDDING_TPM", "1000000"))
+
+MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "5"))
+BACKOFF_BASE = 1.0  # 초
+BACKOFF_MAX = 60.0
+
+
+class TokenBucket:
+    """
+    초당 rate만큼 채워지고 최대 capacity까지 쌓이는 토큰 버킷.
+    acquire()는 필요한 만큼 토큰이 찰 때까지 기다립니다.
+    pause()로 Retry-After 동안 이 버킷을 쓰는 모든 스레드를 멈춥니다.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = max(self.paused_until - now, (amount - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(key, per_minute, burst=None):
+    """key별로 하나씩 공유되는 버킷. burst를 주지 않으면 1분 한도의 1/6(최소 1)까지 몰아서 허용."""
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(per_minute / 60.0, burst or max(1, per_minute // 6))
+            _buckets[key] = bucket
+    return bucket
+
+
+def slack_bucket(method):
+    if method == "chat_postMessage":
+        return get_bucket("slack.chat_postMessage", SLACK_POST_PER_MINUTE)
+    tier = SLACK_METHOD_TIERS.get(method, SLACK_DEFAULT_TIER)
+    return get_bucket(f"slack.{method}", SLACK_TIER_PER_MINUTE[tier])
+
+
+def _header(headers, name):
+    if not headers:
+        return None
+    for key, value in dict(headers).items():
+        if key.lower() == name:
+            return value[0] if isinstance(value, list) else value
+    return None
+
+
+def _loaded(module, name):
+    """이미 import된 모듈의 클래스만 꺼냅니다. import되지 않았다면 그 모듈의 예외일 수도 없음."""
+    return getattr(sys.modules.get(module), name, None)
+
+
+def retry_after(error):
+    """
+    재시도할 만한 오류면 서버가 알려준 대기 시간(초, 없으면 0)을, 아니면 None을 반환합니다.
+    slack_sdk/openai는 여기서 import하지 않고 이미 로드된 경우에만 비교합니다.
+    """
+    SlackApiError = _loaded("slack_sdk.errors", "SlackApiError")
+    if SlackApiError and isinstance(error, SlackApiError):
+        status = getattr(error.response, "status_code", None)
+        if status == 429:
+            return float(_header(error.response.headers, "retry-after") or 1)
+        return 0.0 if status and status >= 500 else None
+    RateLimitError = _loaded("openai", "RateLimitError")
+    if RateLimitError and isinstance(error, RateLimitError):
+        if getattr(error, "code", None) == "insufficient_quota":
+            return None
+        return float(_header(error.response.headers, "retry-after") or 0)
+    transient = tuple(filter(None, (_loaded("openai", "APIConnectionError"), _loaded("openai", "InternalServerError"))))
+    if transient and isinstance(error, transient):
+        return 0.0
+    return None
+
+
+def call_with_retry(fn, *args, buckets=(), max_retries=None, **kwargs):
+    """
+    buckets: [(TokenBucket, 필요한 토큰 수), ...] 를 모두 확보한 뒤 fn을 호출합니다.
+    429/5xx/연결 오류는 Retry-After를 지키고, 지터를 섞은 지수 백오프로 재시도합니다.
+    """
+    max_retries = MAX_RETRIES if max_retries is None else max_retries
+    attempt = 0
+    while True:
+        for bucket, amount in buckets:
+            bucket.acquire(amount)
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            server_wait = retry_after(e)
+            if server_wait is None or attempt >= max_retries:
+                raise
+            backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+            wait = max(server_wait, backoff)
+            if server_wait:
+                # 같은 엔드포인트를 쓰는 다른 스레드도 Retry-After 동안 멈춤
+                for bucket, _ in buckets[:1]:
+                    bucket.pause(server_wait)
+            print(f"⏳ API 제한/오류로 {wait:.1f}초 후 재시도 ({attempt + 1}/{max_retries}): {e}")
+            time.sleep(wait)
+            attempt += 1
+
+
+class RateLimitedSlackClient:
+    """
+    WebClient를 감싸 메서드 호출마다 해당 메서드의 Tier 버킷과 재시도를 적용합니다.
+    메서드가 아닌 속성(token 등)은 그대로 넘깁니다.
+    """
+
+    def __init__(self, web_client):
+        self.web_client = web_client
+
+    def __getattr__(self, name):
+        attr = getattr(self.web_client, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def call(*args, **kwargs):
+            return call_with_retry(attr, *args, buckets=[(slack_bucket(name), 1)], **kwargs)
+        return call
+
+
+def openai_chat_buckets(estimated_tokens):
+    return [
+        (get_bucket("openai.chat", OPENAI_RPM), 1),
+        (get_bucket("openai.chat_tokens", OPENAI_TPM), estimated_tokens),
+    ]
+
+
+def openai_embedding_buckets(estimated_tokens):
+    return [
+        (get_bucket("openai.embeddings", OPENAI_RPM), 1),
+        (get_bucket("openai.embedding_tokens", OPENAI_EMBEDDING_TPM), estimated_tokens),
+    ]
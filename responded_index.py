@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+import time
+
+RESPONDED_MAX_AGE_DAYS = int(os.getenv("RESPONDED_MAX_AGE_DAYS", "30"))
+COMPACT_MIN_LINES = 1000  # 저널이 이 줄 수를 넘고 유효 항목의 2배가 되면 압축
+
+
+class RespondedIndex:
+    """
+    이미 응답한 메시지 ts를 메모리 set(dict)으로 들고 있고, 추가할 때마다 저널 파일에 한 줄씩 덧붙입니다.
+    저널 한 줄 형식: "<ts>\\t<저장 시각>". 시작할 때 한 번만 읽고, max_age_days가 지난 항목은 버립니다.
+    저널이 유효 항목보다 훨씬 길어지거나 하루가 지나면 유효 항목만 남기도록 다시 씁니다(compaction).
+    """
+
+    def __init__(self, path, legacy_path=None, max_age_days=RESPONDED_MAX_AGE_DAYS):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.journal_lines = 0
+        migrated = self._load(legacy_path)
+        self._compact()
+        if migrated:
+            # 저널에 옮겨 적었으니 다음 시작 때 다시 읽지 않도록 이름을 바꿈
+            os.replace(legacy_path, legacy_path + ".migrated")
+
+    def _load(self, legacy_path):
+        now = time.time()
+        migrated = False
+        if legacy_path and os.path.exists(legacy_path):
+            # 예전 JSON 리스트 형식에서 옮겨 옴
+            try:
+                with open(legacy_path, "r") as f:
+                    for ts in json.load(f):
+                        self.entries[ts] = now
+                migrated = True
+            except (OSError, ValueError) as e:
+                print(f"[DEBUG] 기존 응답 기록을 읽지 못했습니다: {e}", flush=True)
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                for line in f:
+                    self.journal_lines += 1
+                    ts, _, saved_at = line.rstrip("\n").partition("\t")
+                    try:
+                        self.entries[ts] = float(saved_at)
+                    except ValueError:
+                        continue  # 마지막 줄이 덜 써진 경우
+        return migrated
+
+    def _compact(self):
+        cutoff = time.time() - self.max_age
+        self.entries = {ts: saved_at for ts, saved_at in self.entries.items() if saved_at >= cutoff}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for ts, saved_at in self.entries.items():
+                f.write(f"{ts}\t{saved_at:.0f}\n")
+        os.replace(tmp_path, self.path)
+        self.journal_lines = len(self.entries)
+        self.compacted_at = time.time()
+
+    def __contains__(self, ts):
+        with self.lock:
+            return ts in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, ts):
+        """ts를 기록합니다. 이미 있으면 False."""
+        with self.lock:
+            if ts in self.entries:
+                return False
+            now = time.time()
+            self.entries[ts] = now
+            with open(self.path, "a") as f:
+                f.write(f"{ts}\t{now:.0f}\n")
+            self.journal_lines += 1
+            if (self.journal_lines > max(COMPACT_MIN_LINES, 2 * len(self.entries))
+                    or now - self.compacted_at > 86400):
+                self._compact()
+            return True
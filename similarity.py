@@ -0,0 +1,95 @@
+import numpy as np
+
+from utils import create_embeddings, estimate_tokens
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+EMBED_BATCH_SIZE = 500   # embeddings.create 한 번에 보낼 최대 텍스트 수 (API 상한 2048)
+EMBED_BATCH_TOKENS = 200000  # 한 요청의 입력 토큰 합 상한 (API 상한 300k, 추정 오차 여유)
+EMBED_MAX_INPUT_TOKENS = 8000  # 텍스트 하나의 입력 토큰 상한 (모델 상한 8191), 넘으면 잘라서 보냄
+SIMILARITY_BLOCK_SIZE = 1024  # 유사도 계산 타일 크기 (타일당 float32 4MB)
+
+
+def truncate_for_embedding(text, max_tokens=EMBED_MAX_INPUT_TOKENS):
+    """토큰 수가 max_tokens를 넘는 텍스트(붙여 넣은 로그 등)는 앞부분만 남깁니다."""
+    tokens = estimate_tokens(text)
+    while tokens > max_tokens:
+        text = text[:int(len(text) * max_tokens / tokens * 0.95)]
+        tokens = estimate_tokens(text)
+    return text
+
+
+def token_batches(texts, batch_size=EMBED_BATCH_SIZE, batch_tokens=EMBED_BATCH_TOKENS):
+    """텍스트 수(batch_size)와 입력 토큰 합(batch_tokens) 둘 다 넘지 않게 나눕니다. (원문, 보낼 텍스트) 목록들."""
+    batch, total = [], 0
+    for text in texts:
+        sent = truncate_for_embedding(text)
+        tokens = estimate_tokens(sent)
+        if batch and (len(batch) >= batch_size or total + tokens > batch_tokens):
+            yield batch
+            batch, total = [], 0
+        batch.append((text, sent))
+        total += tokens
+    if batch:
+        yield batch
+
+
+def embed_texts(texts, model=EMBEDDING_MODEL, batch_size=EMBED_BATCH_SIZE, cache=None):
+    """
+    텍스트를 batch_size개·EMBED_BATCH_TOKENS 토큰 이하 단위로 나눠 임베딩하고 (n, d) float32 배열로 반환합니다.
+    cache(EmbeddingCache)가 주어지면 캐시에 없는 고유 텍스트만 API로 요청합니다. (캐시 키는 자르기 전 원문)
+    """
+    found, missing = cache.get_many(texts) if cache is not None else ({}, list(range(len(texts))))
+    # 같은 텍스트는 한 번만 요청
+    pending = list(dict.fromkeys(texts[i] for i in missing))
+    fetched = {}
+    for pairs in token_batches(pending, batch_size):
+        batch = [text for text, _ in pairs]
+        data = create_embeddings([sent for _, sent in pairs], model=model).data
+        block = np.asarray([e.embedding for e in data], dtype=np.float32)
+        fetched.update(zip(batch, block))
+        if cache is not None:
+            cache.put_many(batch, block)
+    if cache is not None:
+        cache.save()
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    dim = len(next(iter(found.values()))) if found else len(next(iter(fetched.values())))
+    vectors = np.empty((len(texts), dim), dtype=np.float32)
+    for i, vector in found.items():
+        vectors[i] = vector
+    for i in missing:
+        vectors[i] = fetched[texts[i]]
+    return vectors
+
+
+def normalize_rows(vectors):
+    """코사인 유사도 계산을 위해 각 행을 단위 벡터로 만듭니다."""
+    norm = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / (norm + 1e-8)).astype(np.float32, copy=False)
+
+
+def count_similar_pairs(normed, threshold, block_size=SIMILARITY_BLOCK_SIZE):
+    """
+    i < j 인 쌍 중 코사인 유사도가 threshold 이상인 쌍의 수를 셉니다.
+    상삼각 영역만 block_size x block_size 타일로 계산하므로 n x n 행렬을 만들지 않습니다.
+    """
+    n = len(normed)
+    count = 0
+    for i in range(0, n, block_size):
+        rows = normed[i:i + block_size]
+        for j in range(i, n, block_size):
+            hits = (rows @ normed[j:j + block_size].T) >= threshold
+            if i == j:
+                # 대각 타일은 자기 자신과 아래쪽 삼각형을 제외
+                hits = np.triu(hits, k=1)
+            count += int(np.count_nonzero(hits))
+    return count
+
+
+def redundancy_ratio(vectors, threshold=0.85, block_size=SIMILARITY_BLOCK_SIZE):
+    """전체 쌍 대비 threshold 이상 유사한 쌍의 비율."""
+    n = len(vectors)
+    total = n * (n - 1) // 2
+    if not total:
+        return 0.0
+    return count_similar_pairs(normalize_rows(vectors), threshold, block_size) / total
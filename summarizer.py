@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import generate_ai_response, estimate_tokens
+
+# 청크당 대화 토큰 수와 동시에 보낼 요청 수 (환경변수로 조정)
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+SUMMARY_MAX_WORKERS = int(os.getenv("SUMMARY_MAX_WORKERS", "4"))
+
+REDUCE_SUMMARY_PROMPT = """
+다음은 오늘 팀 채널 대화를 구간별로 요약한 내용입니다.
+중복을 합쳐 하나의 요약으로 정리해주세요. 구간 요약에 없는 내용은 추가하지 마세요:
+
+{conversation}
+"""
+
+
+def chunk_texts(texts, max_tokens=None):
+    """메시지 순서를 유지하면서 max_tokens 이하의 청크(문자열)로 묶습니다."""
+    max_tokens = max_tokens or SUMMARY_CHUNK_TOKENS
+    chunks, current, used = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if tokens > max_tokens:
+            # 한 메시지가 예산을 넘으면 앞부분만 사용
+            text = text[:max_tokens]
+            tokens = estimate_tokens(text)
+        if current and used + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, used = [], 0
+        current.append(text)
+        used += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def reduce_summaries(partials, final_prompt, max_tokens=500, temperature=0.7, chunk_tokens=None, max_workers=None):
+    """부분 요약들을 final_prompt({conversation} 자리 포함)로 합칩니다."""
+    with ThreadPoolExecutor(max_workers=max_workers or SUMMARY_MAX_WORKERS) as pool:
+        return _reduce(partials, final_prompt, max_tokens, temperature, chunk_tokens or SUMMARY_CHUNK_TOKENS, pool)
+
+
+def _reduce(partials, final_prompt, max_tokens, temperature, chunk_tokens, pool):
+    """부분 요약이 한 청크에 들어갈 때까지 여러 단계로 합친 뒤 final_prompt로 마무리합니다."""
+    while len(partials) > 1 and sum(estimate_tokens(p) for p in partials) > chunk_tokens:
+        groups = chunk_texts(partials, chunk_tokens)
+        if len(groups) == len(partials):
+            # 더 이상 묶이지 않으면 그대로 마지막 단계로 넘김
+            break
+        partials = list(pool.map(
+            lambda group: generate_ai_response(
+                REDUCE_SUMMARY_PROMPT.format(conversation=group), max_tokens=max_tokens, temperature=0.3),
+            groups,
+        ))
+    return generate_ai_response(
+        final_prompt.format(conversation="\n\n".join(partials)), max_tokens=max_tokens, temperature=temperature)
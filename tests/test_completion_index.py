@@ -0,0 +1,20 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from completion_index import CompletionIndex  # noqa: E402
+
+
+def test_ascii_markers_next_to_hangul():
+    texts = [
+        "로그인 API PR을 올렸습니다",
+        "결제 모듈 리팩터링 merged",
+        "대시보드 PR올렸어요 문서",
+        "로그인 API PR 올렸습니다",
+    ]
+    assert CompletionIndex(texts).completed == {0, 1, 2, 3}
+
+
+def test_pr_inside_english_word_is_not_a_marker():
+    assert CompletionIndex(["PRODUCT 회의 일정 공유", "APRIL 계획"]).completed == set()
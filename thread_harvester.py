@@ -0,0 +1,70 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from message_store import get_store
+
+THREAD_MAX_WORKERS = int(os.getenv("THREAD_MAX_WORKERS", "4"))
+REPLIES_PAGE_SIZE = 200
+
+
+def fetch_replies(slack_client, channel, thread_ts):
+    """conversations_replies를 next_cursor 끝까지 받아 부모 메시지를 뺀 답글 목록을 반환합니다."""
+    replies, cursor = [], None
+    while True:
+        kwargs = {"channel": channel, "ts": thread_ts, "limit": REPLIES_PAGE_SIZE}
+        if cursor:
+            kwargs["cursor"] = cursor
+        response = slack_client.conversations_replies(**kwargs)
+        replies.extend(m for m in response["messages"] if m["ts"] != thread_ts)
+        cursor = response.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            return replies
+
+
+def harvest_threads(slack_client, channel, messages, store=None, max_workers=None):
+    """
+    reply_count가 있는 부모 메시지들의 답글을 모읍니다. {thread_ts: 답글 목록}을 반환합니다.
+    부모의 latest_reply가 저장된 값과 같으면 저장소의 답글을 재사용하고,
+    나머지 스레드만 max_workers개씩 동시에 가져옵니다.
+    부모 메시지의 reply_count/latest_reply가 최신이어야 하므로 messages는
+    load_messages(..., refresh=True)로 받은 것을 넘깁니다.
+    """
+    from slack_sdk.errors import SlackApiError
+    store = store or get_store()
+    threads, stale = {}, []
+    for parent in messages:
+        if not parent.get("reply_count"):
+            continue
+        thread_ts = parent["ts"]
+        saved = store.get_thread(channel, thread_ts)
+        if saved and saved[0] == parent.get("latest_reply"):
+            threads[thread_ts] = saved[1]
+        else:
+            stale.append(parent)
+
+    def fetch(parent):
+        try:
+            replies = fetch_replies(slack_client, channel, parent["ts"])
+        except SlackApiError as e:
+            print(f"스레드 답글 조회 실패 (ts={parent['ts']}): {e}")
+            return parent["ts"], None
+        store.save_thread(channel, parent["ts"], parent.get("latest_reply"), replies)
+        return parent["ts"], replies
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=max_workers or THREAD_MAX_WORKERS) as pool:
+            for thread_ts, replies in pool.map(fetch, stale):
+                if replies is not None:
+                    threads[thread_ts] = replies
+    print(f"🧵 스레드 {len(threads)}개 (새로 조회 {len(stale)}개)")
+    return threads
+
+
+def percentile(sorted_values, q):
+    """정렬된 값에서 q(0~100) 백분위수를 선형 보간으로 구합니다."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
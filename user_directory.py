@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+USER_CACHE_PATH = os.path.join(CACHE_DIR, "users.json")
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", str(6 * 3600)))  # 초
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "5000"))
+
+
+def _display_name(user):
+    profile = user.get("profile", {})
+    return profile.get("display_name") or profile.get("real_name") or user.get("name")
+
+
+class UserDirectory:
+    """
+    user_id -> 표시 이름 캐시 (TTL + LRU).
+    warm()으로 users_list를 페이지 끝까지 한 번에 받아 채우고, 없거나 만료된 항목만 users_info로 조회합니다.
+    path가 있으면 JSON 파일로 실행 간에 유지합니다.
+    """
+
+    def __init__(self, slack_client, ttl=USER_CACHE_TTL, max_size=USER_CACHE_MAX_SIZE, path=USER_CACHE_PATH):
+        self.slack_client = slack_client
+        self.ttl = ttl
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()  # user_id -> [이름, 조회 시각]
+        self.warmed_at = 0
+        self.lock = threading.Lock()
+        self.warm_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.entries = OrderedDict(data["users"])
+            self.warmed_at = data.get("warmed_at", 0)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"사용자 캐시를 읽지 못했습니다: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self.lock:
+            data = {"warmed_at": self.warmed_at, "users": list(self.entries.items())}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _put(self, user_id, name, fetched_at):
+        self.entries[user_id] = [name, fetched_at]
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def warm(self, force=False):
+        """
+        users_list로 워크스페이스 사용자를 한꺼번에 채웁니다. 최근에 채웠으면 건너뜁니다.
+        여러 스레드가 동시에 부르면 하나만 받아 오고 나머지는 그 결과를 기다립니다.
+        """
+        with self.warm_lock:
+            if not force and time.time() - self.warmed_at < self.ttl:
+                return 0
+            return self._warm()
+
+    def _warm(self):
+        now = time.time()
+        from slack_sdk.errors import SlackApiError
+        count, cursor = 0, None
+        try:
+            while True:
+                kwargs = {"limit": 200}
+                if cursor:
+                    kwargs["cursor"] = cursor
+                response = self.slack_client.users_list(**kwargs)
+                with self.lock:
+                    for user in response["members"]:
+                        if not user.get("deleted"):
+                            self._put(user["id"], _display_name(user), now)
+                            count += 1
+                cursor = response.get("response_metadata", {}).get("next_cursor")
+                if not cursor:
+                    break
+        except SlackApiError as e:
+            print(f"사용자 목록 조회 실패: {e}")
+            return count
+        self.warmed_at = now
+        self.save()
+        print(f"👥 사용자 {count}명 캐시 완료")
+        return count
+
+    def display_name(self, user_id, default="사용자"):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry and time.time() - entry[1] < self.ttl:
+                self.entries.move_to_end(user_id)
+                return entry[0] or default
+        try:
+            user = self.slack_client.users_info(user=user_id)["user"]
+        except Exception as e:
+            print(f"[DEBUG] 닉네임 조회 실패: {e}", flush=True)
+            # 만료된 이름이라도 있으면 사용
+            return entry[0] if entry and entry[0] else default
+        name = _display_name(user)
+        with self.lock:
+            self._put(user_id, name, time.time())
+        return name or default
+
+
+_directory = None
+_directory_lock = threading.Lock()
+
+
+def get_user_directory(slack_client=None):
+    """프로세스 전체에서 공유하는 UserDirectory (기본 클라이언트: utils.get_slack_client())"""
+    global _directory
+    with _directory_lock:
+        if _directory is None:
+            if slack_client is None:
+                from utils import get_slack_client
+                slack_client = get_slack_client()
+            _directory = UserDirectory(slack_client)
+    return _directory
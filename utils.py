@@ -1,22 +1,140 @@
 import os
-from slack_sdk import WebClient
+import threading
 from dotenv import load_dotenv
-from openai import OpenAI
+from llm_cache import get_llm_cache, cache_key
+from live_message import LiveMessage
+from rate_limit import RateLimitedSlackClient, call_with_retry, openai_chat_buckets, openai_embedding_buckets
 
+# 다른 모듈의 환경변수 상수보다 먼저 .env를 읽어야 하므로 dotenv만 import 시점에 로드
 load_dotenv()
-slack_client = WebClient(token=os.getenv("SLACK_BOT_TOKEN"))
 CHANNEL_ID = os.getenv("CHANNEL_ID")
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def send_slack_message(message):
-    slack_client.chat_postMessage(channel=CHANNEL_ID, text=message)
+# 클라이언트 레지스트리: slack_sdk/openai/notion_client 같은 무거운 모듈은 처음 쓸 때 import하고
+# 클라이언트는 이름별로 한 번만 만들어 프로세스 전체(데몬의 여러 작업, 워커 스레드)가 공유
+_clients = {}
+_clients_lock = threading.RLock()
 
-def generate_ai_response(prompt):
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=300,
-        temperature=0.7,
+def get_client(name, factory):
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = factory()
+    return client
+
+# API 주소는 환경변수로 바꿀 수 있음 (bench/의 로컬 가짜 서버 등)
+def _create_slack_client():
+    from slack_sdk import WebClient
+    # Slack 호출은 메서드별 Tier 한도와 429 재시도를 거치도록 감쌈
+    return RateLimitedSlackClient(WebClient(
+        token=os.getenv("SLACK_BOT_TOKEN"), base_url=os.getenv("SLACK_API_URL") or WebClient.BASE_URL))
+
+def _create_openai_client():
+    from openai import OpenAI
+    # 재시도는 rate_limit.call_with_retry에서 처리
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=os.getenv("OPENAI_BASE_URL") or None, max_retries=0)
+
+def _create_notion_client():
+    import notion_client
+    options = {"base_url": os.getenv("NOTION_BASE_URL")} if os.getenv("NOTION_BASE_URL") else {}
+    return notion_client.Client(auth=os.getenv("NOTION_TOKEN"), **options)
+
+def _load_encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return False  # 없음도 기억해 두어 매번 import를 다시 시도하지 않음
+
+def get_slack_client():
+    return get_client("slack", _create_slack_client)
+
+def get_openai_client():
+    return get_client("openai", _create_openai_client)
+
+def get_notion_client():
+    return get_client("notion", _create_notion_client)
+
+def __getattr__(name):
+    """예전 이름(utils.slack_client, utils.client)으로 접근해도 레지스트리의 클라이언트를 돌려줌"""
+    if name == "slack_client":
+        return get_slack_client()
+    if name == "client":
+        return get_openai_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def estimate_tokens(text):
+    """토큰 수 추정. tiktoken이 없으면 UTF-8 3바이트당 1토큰으로 계산 (한글 1글자 ≈ 1토큰)"""
+    encoding = get_client("tiktoken", _load_encoding)
+    if encoding:
+        return len(encoding.encode(text))
+    return len(text.encode("utf-8")) // 3 + 1
+
+def chat_completion(messages, model="gpt-3.5-turbo", max_tokens=300, **kwargs):
+    """
+    chat.completions.create를 요청 수/토큰 수 한도 안에서 호출합니다.
+    토큰 버킷에는 프롬프트 추정 토큰 + max_tokens를 미리 차감합니다.
+    LLM_CACHE=1 이면 같은 모델/파라미터/프롬프트의 응답을 로컬 캐시에서 돌려줍니다.
+    """
+    cache = get_llm_cache()
+    if cache is not None:
+        key = cache_key(model, messages, dict(kwargs, max_tokens=max_tokens))
+        cached = cache.get(key)
+        if cached is not None:
+            from openai.types.chat import ChatCompletion
+            return ChatCompletion.model_validate_json(cached)
+    estimated = sum(estimate_tokens(m["content"]) for m in messages) + max_tokens
+    response = call_with_retry(
+        get_openai_client().chat.completions.create,
+        buckets=openai_chat_buckets(estimated),
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        **kwargs,
+    )
+    if cache is not None:
+        cache.put(key, response.model_dump_json())
+    return response
+
+def report_llm_cache():
+    cache = get_llm_cache()
+    if cache is not None:
+        print(cache.stats())
+
+def stream_chat_completion(messages, model="gpt-3.5-turbo", max_tokens=300, **kwargs):
+    """스트리밍 응답의 텍스트 조각을 차례로 내보냅니다. (캐시는 쓰지 않음)"""
+    estimated = sum(estimate_tokens(m["content"]) for m in messages) + max_tokens
+    stream = call_with_retry(
+        get_openai_client().chat.completions.create,
+        buckets=openai_chat_buckets(estimated),
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        stream=True,
+        **kwargs,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def create_embeddings(texts, model="text-embedding-ada-002"):
+    estimated = sum(estimate_tokens(t) for t in texts)
+    return call_with_retry(
+        get_openai_client().embeddings.create,
+        buckets=openai_embedding_buckets(estimated),
+        input=texts,
+        model=model,
+    )
+
+def send_slack_message(message, channel=None):
+    get_slack_client().chat_postMessage(channel=channel or CHANNEL_ID, text=message)
+
+def generate_ai_response(prompt, max_tokens=300, temperature=0.7):
+    response = chat_completion(
+        [{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        temperature=temperature,
     )
     return response.choices[0].message.content.strip()
 
@@ -27,18 +145,30 @@ def add_clap_reaction(ts, channel=None):
     """
     if channel is None:
         channel = CHANNEL_ID
-    slack_client.reactions_add(
+    get_slack_client().reactions_add(
         channel=channel,
         name="clap",
         timestamp=ts
     )
 
-def show_progress(message):
+def show_progress(message, channel=None):
+    """
+    진행 상황 메시지를 채널에 게시하고 LiveMessage를 반환합니다. 게시에 실패하면 None.
+    이후 update_progress는 1초에 한 번만 chat_update로 반영됩니다.
+    """
     print(message, flush=True)
-    return None
+    try:
+        return LiveMessage(get_slack_client(), channel or CHANNEL_ID, message)
+    except Exception as e:
+        print(f"진행 상황 메시지 게시 실패: {e}", flush=True)
+        return None
 
 def update_progress(progress_message, message):
     print(message, flush=True)
+    if progress_message is not None:
+        progress_message.update(message)
 
 def delete_progress(progress_message):
-    print("진행 상황 메시지 삭제", flush=True) 
\ No newline at end of file
+    print("진행 상황 메시지 삭제", flush=True)
+    if progress_message is not None:
+        progress_message.delete() 
\ No newline at end of file